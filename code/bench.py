@@ -0,0 +1,375 @@
+"""
+Benchmarks for the hot paths of the modules in this folder.
+Each benchmark builds synthetic data, then times one operation.
+Results are JSON, so two runs can be compared to find regressions.
+
+Examples:
+    python bench.py run --scale small --output before.json
+    python bench.py run --scale small --output after.json --only graph
+    python bench.py compare before.json after.json --threshold 0.2
+"""
+
+from argparse import ArgumentParser
+from io import BytesIO
+from json import dumps, loads
+from pathlib import Path
+from platform import platform, python_version
+from statistics import median
+from time import perf_counter, strftime
+
+from numpy.random import default_rng
+from pandas import DataFrame, Series, date_range
+
+from classify import Classifier
+from cluster import Hierarchy
+from graph import GraphFrame, barneshut, randomz, repel
+from plot import Plotter, headless
+from tools import Bands, afew, princols, zscores
+
+SCALES = ("small", "medium", "large")
+
+# Synthetic data
+
+
+def graphlinks(nnodes, degree=4, seed=0):
+    """DataFrame: Random [source, target] links with preferential attachment."""
+    rng = default_rng(seed)
+
+    sources = rng.integers(0, nnodes, nnodes * degree)
+    targets = (nnodes * rng.random(nnodes * degree) ** 2).astype("int64")
+
+    return DataFrame({"source": sources, "target": targets})
+
+
+def labeled(nrows, ncols=8, nclasses=3, seed=0):
+    """DataFrame: Gaussian blobs with a 'label' column naming each blob."""
+    rng = default_rng(seed)
+
+    codes = rng.integers(0, nclasses, nrows)
+    centers = rng.normal(0, 3, (nclasses, ncols))
+    values = centers[codes] + rng.standard_normal((nrows, ncols))
+    data = DataFrame(values, columns=[f"x{i}" for i in range(ncols)])
+    data["label"] = Series([f"class{i}" for i in codes], dtype="category")
+
+    return data
+
+
+def timeseries(nrows, seed=0):
+    """Series: Random walk with one value per second."""
+    rng = default_rng(seed)
+    index = date_range("2000-01-01", periods=nrows, freq="s")
+
+    return Series(rng.standard_normal(nrows).cumsum(), index=index, name="walk")
+
+
+# Benchmarks return a function to time
+
+
+def graph_construct(n):
+    """function: GraphFrame from about 4n random links."""
+    links = graphlinks(n)
+    return lambda: GraphFrame(links)
+
+
+def graph_matrix(n):
+    """function: Adjacency matrix of a graph with n nodes."""
+    graph = GraphFrame(graphlinks(n))
+
+    def run():
+        graph.cache.clear()
+        return graph.matrix
+
+    return run
+
+
+def graph_springs(n):
+    """function: Spring matrix of a graph with n nodes."""
+    graph = GraphFrame(graphlinks(n))
+    matrix = graph.matrix
+
+    def run():
+        graph.cache.clear()
+        graph.cache["matrix"] = matrix
+        return graph.springs
+
+    return run
+
+
+def graph_layout(n):
+    """function: 16 layout steps for a graph with n nodes."""
+    graph = GraphFrame(graphlinks(n))
+    return lambda: graph(nsteps=16, seed=0)
+
+
+def graph_repel(n):
+    """function: Exact repulsion between n points."""
+    points = randomz(n, default_rng(0))
+    return lambda: repel(points)
+
+
+def graph_barneshut(n):
+    """function: Barnes-Hut repulsion between n points."""
+    points = randomz(n, default_rng(0))
+    return lambda: barneshut(points)
+
+
+def cluster_linkage(n):
+    """function: Exact hierarchical clustering of n rows."""
+    data = labeled(n).drop(columns="label")
+    return lambda: Hierarchy(data, nreps=0)
+
+
+def cluster_cut(n):
+    """function: One uncached cut of a tree with n leaves."""
+    hier = Hierarchy(labeled(n).drop(columns="label"), nreps=0)
+
+    def run():
+        hier.cuts.cache_clear()
+        return hier(8)
+
+    return run
+
+
+def cluster_sweep(n):
+    """function: 64 cuts of a tree with n leaves."""
+    hier = Hierarchy(labeled(n).drop(columns="label"), nreps=0)
+    _ = hier.index  # build the cached tree index outside the timed function
+    return lambda: hier.sweep(range(2, 66))
+
+
+def classify_fit(n):
+    """function: Train LogisticRegression on n rows."""
+    data = labeled(n)
+    return lambda: Classifier(data, "label")
+
+
+def classify_call(n):
+    """function: Predict classes of n rows as a Series."""
+    data = labeled(n)
+    classifier = Classifier(data, "label")
+    return lambda: classifier(data)
+
+
+def classify_predict(n):
+    """function: Predict class codes of n rows with NumPy input."""
+    data = labeled(n)
+    classifier = Classifier(data, "label")
+    values = data[classifier.features].to_numpy("float64")
+    return lambda: classifier.predict(values)
+
+
+def classify_probs(n):
+    """function: Predict class probabilities of n rows."""
+    data = labeled(n)
+    classifier = Classifier(data, "label")
+    return lambda: classifier.probs(data)
+
+
+def classify_confusion(n):
+    """function: Confusion matrix of n rows."""
+    data = labeled(n)
+    classifier = Classifier(data, "label")
+    return lambda: classifier.confusion(data)
+
+
+def classify_binary(n):
+    """function: Confusion matrix of a two-class RidgeClassifier (1D coef_)."""
+    data = labeled(n, nclasses=2)
+    classifier = Classifier(data, "label", "RidgeClassifier")
+    return lambda: classifier.confusion(data)
+
+
+def tools_bands(n):
+    """function: Daily quantile bands of n seconds, added in 8 chunks."""
+    ts = timeseries(n)
+    chunks = [ts.iloc[i : i + n // 8] for i in range(0, n, n // 8)]
+    return lambda: Bands("D").update(*chunks).quantiles([0.05, 0.5, 0.95])
+
+
+def tools_princols(n):
+    """function: 2 principal components of n rows and 32 columns."""
+    data = labeled(n, ncols=32)
+    return lambda: princols(data, 2)
+
+
+def tools_zscores(n):
+    """function: Standardize n rows and 32 columns."""
+    data = labeled(n, ncols=32)
+    return lambda: zscores(data)
+
+
+def tools_afew(n):
+    """function: 5 random rows from n rows."""
+    data = labeled(n)
+    return lambda: afew(data, 5, seed=0)
+
+
+def plot_line(n):
+    """function: Line plot of n points saved as PNG."""
+    data = timeseries(n).to_frame()
+    return lambda: rendered("line", data)
+
+
+def plot_scatter(n):
+    """function: Scatterplot of n points saved as PNG."""
+    data = labeled(n).iloc[:, :3]
+    return lambda: rendered("scatter", data)
+
+
+def plot_heat(n):
+    """function: Heatmap of about n cells saved as PNG."""
+    side = int(n**0.5)
+    data = DataFrame(default_rng(0).random((side, side)))
+    return lambda: rendered("heat", data)
+
+
+def plot_quant(n):
+    """function: Hourly quantiles of n seconds saved as PNG."""
+    ts = timeseries(n)
+    return lambda: rendered("quant", ts, freq="h")
+
+
+def rendered(method, data, **kwargs):
+    """int: Draw one chart headless, save it as PNG, and return its size in bytes."""
+    plotter = Plotter(headless=True)
+    ax = getattr(plotter, method)(data, **kwargs)
+    with BytesIO() as file:
+        ax.figure.savefig(file, format="png")
+        size = file.tell()
+    plotter.close(ax.figure)
+
+    return size
+
+
+# Problem sizes for small, medium, and large scales
+BENCHES = {
+    "graph.construct": (graph_construct, (1_000, 10_000, 100_000)),
+    "graph.matrix": (graph_matrix, (1_000, 10_000, 100_000)),
+    "graph.springs": (graph_springs, (1_000, 10_000, 100_000)),
+    "graph.layout": (graph_layout, (1_000, 10_000, 100_000)),
+    "graph.repel": (graph_repel, (500, 2_000, 8_000)),
+    "graph.barneshut": (graph_barneshut, (1_000, 10_000, 100_000)),
+    "cluster.linkage": (cluster_linkage, (300, 1_000, 3_000)),
+    "cluster.cut": (cluster_cut, (300, 1_000, 3_000)),
+    "cluster.sweep": (cluster_sweep, (300, 1_000, 3_000)),
+    "classify.fit": (classify_fit, (1_000, 10_000, 100_000)),
+    "classify.call": (classify_call, (1_000, 10_000, 100_000)),
+    "classify.predict": (classify_predict, (1_000, 10_000, 100_000)),
+    "classify.probs": (classify_probs, (1_000, 10_000, 100_000)),
+    "classify.confusion": (classify_confusion, (1_000, 10_000, 100_000)),
+    "classify.binary": (classify_binary, (1_000, 10_000, 100_000)),
+    "tools.bands": (tools_bands, (100_000, 1_000_000, 10_000_000)),
+    "tools.princols": (tools_princols, (1_000, 10_000, 100_000)),
+    "tools.zscores": (tools_zscores, (1_000, 10_000, 100_000)),
+    "tools.afew": (tools_afew, (1_000, 100_000, 1_000_000)),
+    "plot.line": (plot_line, (1_000, 10_000, 100_000)),
+    "plot.scatter": (plot_scatter, (1_000, 10_000, 100_000)),
+    "plot.heat": (plot_heat, (1_000, 10_000, 100_000)),
+    "plot.quant": (plot_quant, (10_000, 100_000, 1_000_000)),
+}
+
+
+def compare(old, new, threshold=0.2):
+    """
+    DataFrame: Ratio of new to old best times for benchmarks in both runs.
+    A benchmark regressed if it is more than threshold slower,
+    e.g. threshold=0.2 flags anything more than 20% slower.
+    """
+    old, new = old["results"], new["results"]
+
+    rows = []
+    for name in sorted(set(old) & set(new)):
+        before, after = old[name]["seconds"], new[name]["seconds"]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, ratio, ratio > 1 + threshold))
+
+    columns = ["benchmark", "old", "new", "ratio", "regressed"]
+
+    return DataFrame(rows, columns=columns).set_index("benchmark")
+
+
+def environment():
+    """dict: Python, platform, and package versions."""
+    import matplotlib
+    import numpy
+    import pandas
+    import scipy
+    import sklearn
+
+    packages = [matplotlib, numpy, pandas, scipy, sklearn]
+
+    return {
+        "python": python_version(),
+        "platform": platform(),
+        "packages": {x.__name__: x.__version__ for x in packages},
+    }
+
+
+def run(scale="small", nrepeat=3, only=()):
+    """
+    dict: Best and median seconds for each benchmark at one scale.
+    Setup is not timed. Each benchmark runs once to warm up, then nrepeat times.
+    If only, then run only benchmarks whose names start with one of those strings.
+    """
+    headless()
+
+    results = {}
+    for name, (bench, sizes) in BENCHES.items():
+        if only and not name.startswith(tuple(only)):
+            continue
+
+        size = sizes[SCALES.index(scale)]
+        func = bench(size)
+        func()
+
+        times = []
+        for _ in range(nrepeat):
+            start = perf_counter()
+            func()
+            times.append(perf_counter() - start)
+
+        results[name] = {"size": size, "seconds": min(times), "median": median(times)}
+
+    meta = {"scale": scale, "nrepeat": nrepeat, "time": strftime("%Y-%m-%dT%H:%M:%S")}
+
+    return {"meta": meta | environment(), "results": results}
+
+
+def main():
+    """int: Run benchmarks or compare two runs. Return 1 if anything regressed."""
+    parser = ArgumentParser(description="Time hot paths with synthetic data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runner = commands.add_parser("run", help="run benchmarks and write JSON")
+    runner.add_argument("--scale", choices=SCALES, default="small")
+    runner.add_argument("--nrepeat", type=int, default=3, help="timed runs each")
+    runner.add_argument("--only", nargs="*", default=(), help="name prefixes")
+    runner.add_argument("--output", help="JSON file to write (default stdout)")
+
+    comparer = commands.add_parser("compare", help="compare two JSON files")
+    comparer.add_argument("old", help="JSON file from an earlier run")
+    comparer.add_argument("new", help="JSON file from a later run")
+    comparer.add_argument("--threshold", type=float, default=0.2)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        text = dumps(run(args.scale, args.nrepeat, args.only), indent=2)
+        if args.output:
+            Path(args.output).write_text(text)
+        else:
+            print(text)
+        return 0
+
+    old = loads(Path(args.old).read_text())
+    new = loads(Path(args.new).read_text())
+    if old["meta"]["scale"] != new["meta"]["scale"]:
+        print("Warning: runs used different scales")
+
+    table = compare(old, new, args.threshold)
+    print(table.to_string(float_format="{:.4f}".format))
+
+    return int(table["regressed"].any())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
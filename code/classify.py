@@ -1,5 +1,147 @@
-from pandas import Categorical, DataFrame, Series, crosstab
-from sklearn import linear_model
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from json import dumps, loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from numpy import arange, array, asarray, atleast_2d, bincount, cumsum, exp, load, log
+from numpy import save, split, vstack, zeros
+from numpy.random import default_rng
+from pandas import Categorical, DataFrame, Series
+
+FORMAT = "Classifier"
+
+
+def gridded(grid):
+    """Generate (model, kwargs) pairs: Every combination of parameters in grid."""
+    for model, params in grid.items():
+        names = list(params)
+        for values in product(*(params[x] for x in names)):
+            yield model, dict(zip(names, values))
+
+
+def linearmodel(name):
+    """class: sklearn.linear_model class. Import sklearn only when needed."""
+    from sklearn import linear_model
+
+    return getattr(linear_model, str(name))
+
+
+def modelname(model):
+    """str: Name of model class, or of the class a LinearModel was saved from."""
+    return getattr(model, "kind", type(model).__name__)
+
+
+def niters(model):
+    """int or None: Number of solver iterations used by a fitted model."""
+    niter = getattr(model, "n_iter_", None)
+
+    return None if (niter is None) else int(asarray(niter).max())
+
+
+def scorecodes(model, scores):
+    """numpy int array: Class codes predicted by linear decision scores."""
+    scores = asarray(scores).reshape(len(scores), -1)  # binary models may be 1D
+    if scores.shape[1] == 1:
+        codes = (scores[:, 0] > 0).astype("int64")
+    else:
+        codes = scores.argmax(axis=1)
+
+    return model.classes_[codes]
+
+
+def scoreprobs(model, scores):
+    """numpy array: LogisticRegression probabilities from decision scores."""
+    if scores.shape[1] == 1:
+        scores = scores[:, [0, 0]] * [-1, 1]
+        return 1 / (1 + exp(-scores))
+
+    multi = getattr(model, "multi_class", "multinomial")  # sklearn < 1.8
+    if (multi == "ovr") or (multi != "multinomial" and model.solver == "liblinear"):
+        probs = 1 / (1 + exp(-scores))
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    return softmax(scores)
+
+
+def softmax(scores):
+    """numpy array: Rows of scores converted to probabilities."""
+    probs = exp(scores - scores.max(axis=1, keepdims=True))
+    probs /= probs.sum(axis=1, keepdims=True)
+
+    return probs
+
+
+def timings(classifier, data, sizes=(1, 10, 100, 1000), nrepeat=100):
+    """
+    DataFrame: Seconds per call for Classifier() and Classifier.predict().
+    Each row is a batch size. Batches are converted to NumPy before timing.
+    """
+    stats = []
+    for size in sizes:
+        batch = data.iloc[arange(size) % len(data)]
+        values = batch[classifier.features].to_numpy("float64")
+
+        start = perf_counter()
+        for _ in range(nrepeat):
+            classifier(batch)
+        slow = (perf_counter() - start) / nrepeat
+
+        start = perf_counter()
+        for _ in range(nrepeat):
+            classifier.predict(values)
+        fast = (perf_counter() - start) / nrepeat
+
+        stats.append((size, slow, fast))
+
+    stats = DataFrame(stats, columns=["rows", "call", "predict"]).set_index("rows")
+    stats["speedup"] = stats["call"] / stats["predict"]
+
+    return stats
+
+
+def sweepjob(job):
+    """
+    dict: Scores for one (model, kwargs, fold) job from Classifier.sweep().
+    Training and test rows are indexed straight from the memory-mapped arrays,
+    so no DataFrame of all features is built.
+    """
+    folder, target, classes, model, kwargs, fold = job
+    values = load(Path(folder) / "values.npy", mmap_mode="r")
+    codes = load(Path(folder) / "codes.npy", mmap_mode="r")
+    test = load(Path(folder) / "folds.npy", mmap_mode="r") == fold
+    train = ~test
+
+    start = perf_counter()
+    estimator = linearmodel(model)(**kwargs).fit(values[train], codes[train])
+    fitted = perf_counter() - start
+    metrics = Metrics(classes, target)
+    metrics.update(codes[test], estimator.predict(values[test]))
+    scored = perf_counter() - start - fitted
+
+    recall = metrics.scores["recall"]
+
+    return {
+        "model": model,
+        "params": kwargs,
+        "fold": fold,
+        "accuracy": metrics.summary["accuracy"],
+        "balanced_accuracy": recall.mean(),
+        "worst_recall": recall.min(),
+        "worst_class": recall.idxmin(),
+        "fit_seconds": fitted,
+        "score_seconds": scored,
+    }
+
+
+def throughput(stats):
+    """DataFrame: Rows, seconds, and rows per second from (rows, seconds) pairs."""
+    stats = DataFrame(stats, columns=["rows", "seconds"])
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"]
+    stats.index.name = "chunk"
+
+    return stats
 
 
 class Classifier:
@@ -13,21 +155,33 @@ class Classifier:
         data    DataFrame: observations to use for training
         target  string: name of column to predict
         model   optional str: name of an sklearn.linear_model
+        callback    optional callable: called with training time (see probe)
         kwargs  are passed to the selected sklearn.linear_model
 
     Call inputs:
         data    DataFrame: features to use for prediction
+
+    Training speed is saved in .throughput with one row per chunk.
     """
 
-    def __init__(self, data, target, model="LogisticRegression", **kwargs):
-        model = getattr(linear_model, str(model))
+    def __init__(
+        self, data, target, model="LogisticRegression", callback=None, **kwargs
+    ):
+        model = linearmodel(model)
         feats = data.drop(columns=target)
         cats = Categorical(data[target])
 
+        start = perf_counter()
+        model = model(**kwargs).fit(feats, cats.codes)
+        stats = [(len(data), perf_counter() - start)]
+        if callback is not None:
+            callback("fit", stats[0][1], rows=len(data), niter=niters(model))
+
         self.classes = cats.categories.tolist()
         self.features = feats.columns.tolist()
         self.target = target
-        self.model = model(**kwargs).fit(feats, cats.codes)
+        self.model = model
+        self.throughput = throughput(stats)
 
     def __call__(self, data):
         classes = self.classes
@@ -41,7 +195,148 @@ class Classifier:
         return cats
 
     def __repr__(self):
-        return f"{type(self).__name__}({type(self.model).__name__})"
+        return f"{type(self).__name__}({modelname(self.model)})"
+
+    # Constructors
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks,
+        target,
+        classes=None,
+        model="SGDClassifier",
+        callback=None,
+        **kwargs,
+    ):
+        """
+        Classifier: Train with partial_fit() on one DataFrame at a time.
+        Use for training data which does not fit in memory,
+        e.g. pandas.read_csv(path, chunksize=100_000).
+
+        Inputs:
+            chunks  iterable of DataFrames: observations to use for training
+            target  string: name of column to predict
+            classes optional list: all possible target values
+            model   str: name of an sklearn.linear_model with partial_fit()
+            callback    optional callable: called with time per chunk (see probe)
+            kwargs  are passed to the selected sklearn.linear_model
+
+        If classes are not given, then the first chunk must include all classes.
+        Chunks with any other target values will raise a ValueError.
+        """
+        model = linearmodel(model)(**kwargs)
+        if not hasattr(model, "partial_fit"):
+            msg = f"{type(model).__name__} cannot train on chunks"
+            raise NotImplementedError(msg)
+
+        features, stats = None, []
+        for chunk in chunks:
+            start = perf_counter()
+            if features is None:
+                features = chunk.columns.drop(target).tolist()
+                if classes is None:
+                    classes = Categorical(chunk[target]).categories
+                classes = list(classes)
+
+            codes = Categorical(chunk[target], categories=classes).codes
+            if (codes < 0).any():
+                unknown = chunk[target].loc[codes < 0].unique().tolist()
+                raise ValueError(f"unknown {target} values: {unknown}")
+
+            model.partial_fit(chunk[features], codes, classes=arange(len(classes)))
+            stats.append((len(chunk), perf_counter() - start))
+            if callback is not None:
+                callback("chunk", stats[-1][1], rows=len(chunk), chunk=len(stats))
+
+        if features is None:
+            raise ValueError("no chunks to train on")
+
+        classifier = cls.__new__(cls)
+        classifier.classes = classes
+        classifier.features = features
+        classifier.target = target
+        classifier.model = model
+        classifier.throughput = throughput(stats)
+
+        return classifier
+
+    @classmethod
+    def sweep(cls, data, target, grid, folds=5, n_jobs=None, seed=0):
+        """
+        DataFrame: Cross-validated scores for many models and parameters.
+        Each row is one (model, params, fold) job. Jobs run in a process pool.
+        Features are saved once to a temporary .npy file which every worker
+        memory-maps, so each job copies only its own training and test rows.
+
+        Inputs:
+            data    DataFrame: observations with numeric features
+            target  string: name of column to predict
+            grid    dict: {model name: {parameter: [values to try]}}
+            folds   int: number of cross-validation folds
+            n_jobs  int or None: number of processes (1 to run in this process)
+            seed    int: seed for assigning rows to folds
+
+        Example grid:
+            {"LogisticRegression": {"C": [0.1, 1, 10]}, "RidgeClassifier": {}}
+        """
+        features = data.columns.drop(target).tolist()
+        cats = Categorical(data[target])
+        classes = cats.categories.tolist()
+
+        with TemporaryDirectory() as folder:
+            save(Path(folder) / "values.npy", data[features].to_numpy("float64"))
+            save(Path(folder) / "codes.npy", cats.codes)
+            save(
+                Path(folder) / "folds.npy",
+                default_rng(seed).permutation(len(data)) % folds,
+            )
+
+            jobs = [
+                (folder, target, classes, model, kwargs, fold)
+                for model, kwargs in gridded(grid)
+                for fold in range(folds)
+            ]
+            if n_jobs == 1:
+                scores = list(map(sweepjob, jobs))
+            else:
+                with ProcessPoolExecutor(n_jobs) as pool:
+                    scores = list(pool.map(sweepjob, jobs))
+
+        return DataFrame(scores)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Classifier: Linear classifier from a folder written by Classifier.save().
+        The model is a LinearModel scored with NumPy, so sklearn is not imported.
+        If mmap, then coefficients are memory-mapped read-only instead of read.
+        Processes which load the same folder share one copy in memory.
+        """
+        path = Path(path)
+        meta = loads((path / "classifier.json").read_text())
+        if meta.get("format") != FORMAT:
+            raise ValueError(f"not a saved Classifier: {path}")
+
+        mode = "r" if mmap else None
+        model = LinearModel(
+            load(path / "coef.npy", mmap_mode=mode),
+            load(path / "intercept.npy", mmap_mode=mode),
+            len(meta["classes"]),
+            meta["model"],
+            meta["params"],
+        )
+
+        classifier = cls.__new__(cls)
+        classifier.classes = meta["classes"]
+        classifier.features = meta["features"]
+        classifier.target = meta["target"]
+        classifier.model = model
+        classifier.throughput = throughput([])
+
+        return classifier
+
+    # Properties
 
     @property
     def coefs(self):
@@ -53,6 +348,8 @@ class Classifier:
         """dict: Model parameters."""
         return self.model.get_params()
 
+    # Evaluation methods
+
     def confusion(self, data):
         """
         DataFrame: Confusion matrix of correct and wrong prediction counts.
@@ -61,7 +358,46 @@ class Classifier:
         Inputs:
             data    DataFrame: observations to use for testing
         """
-        return crosstab(data[self.target], self(data))
+        return self.evaluate(data, probs=False).confusion
+
+    def evaluate(self, data, probs=True):
+        """
+        Metrics: Confusion matrix, precision, recall, F1, and log loss.
+        Each chunk is scored once. Predicted classes and probabilities
+        both come from the same decision scores when the model is linear.
+
+        Inputs:
+            data    DataFrame or iterable of DataFrames: observations to test
+            probs   bool: also compute log loss if the model has probabilities?
+        """
+        classes = self.classes
+        features = self.features
+        model = self.model
+
+        linear = hasattr(model, "coef_")
+        probs = probs and hasattr(model, "predict_proba")
+        logistic = modelname(model) == "LogisticRegression"
+
+        metrics = Metrics(classes, self.target)
+        for chunk in [data] if isinstance(data, DataFrame) else data:
+            true = Categorical(chunk[self.target], categories=classes).codes
+            feats = chunk[features]
+            if linear:
+                scores = self.scores(feats.to_numpy("float64"))
+                pred = scorecodes(model, scores)
+            else:
+                pred = model.predict(feats)
+
+            if not probs:
+                chunkprobs = None
+            elif linear and logistic:
+                chunkprobs = scoreprobs(model, scores)
+            else:
+                chunkprobs = model.predict_proba(feats)  # keeps feature names
+
+            metrics.update(true, pred, chunkprobs)
+
+        return metrics
 
     def probs(self, data):
         """DataFrame: Predicted class probabilities for each row in data."""
@@ -70,10 +406,266 @@ class Classifier:
         model = self.model
 
         if not hasattr(model, "predict_proba"):
-            msg = f"{type(model).__name__} cannot predict probabilities"
+            msg = f"{modelname(model)} cannot predict probabilities"
             raise NotImplementedError(msg)
 
         probs = model.predict_proba(data[features])
         probs = DataFrame(probs, columns=classes, index=data.index)
 
         return probs
+
+    # Fast prediction methods with NumPy input
+
+    def featureorder(self, columns):
+        """
+        numpy int array: Positions of self.features in columns.
+        Use values[:, order] to put columns of a NumPy array in feature order.
+        """
+        order = [list(columns).index(x) for x in self.features]
+
+        return asarray(order)
+
+    def predict(self, values, labels=False):
+        """
+        numpy array: Predicted class code (or label) for each row of values.
+        Scores linear models with NumPy directly, skipping pandas and sklearn
+        input checks. Output matches Classifier() for the same features.
+
+        Inputs:
+            values  2D float array: features in the same order as self.features
+            labels  bool: return class labels instead of integer codes?
+        """
+        codes = scorecodes(self.model, self.scores(values))
+
+        return asarray(self.classes, dtype=object)[codes] if labels else codes
+
+    def predict_batches(self, batches, labels=False):
+        """
+        list of numpy arrays: predict() for many small arrays at once.
+        Stacks all batches, scores them together, then splits the results.
+        """
+        batches = [
+            asarray(x, dtype="float64").reshape(-1, len(self.features)) for x in batches
+        ]
+        stops = cumsum([len(x) for x in batches])[:-1]
+
+        return split(self.predict(vstack(batches), labels), stops)
+
+    def predict_probs(self, values):
+        """
+        numpy array: Predicted class probabilities for each row of values.
+        Columns are self.classes. LogisticRegression models are scored with
+        NumPy directly. Other models fall back to model.predict_proba().
+        """
+        model = self.model
+
+        values = asarray(values, dtype="float64").reshape(-1, len(self.features))
+        if modelname(model) != "LogisticRegression":
+            if not hasattr(model, "predict_proba"):
+                msg = f"{modelname(model)} cannot predict probabilities"
+                raise NotImplementedError(msg)
+            return model.predict_proba(values)
+
+        return scoreprobs(model, self.scores(values))
+
+    def save(self, path):
+        """
+        None: Write a linear classifier to a folder of NumPy arrays.
+        Load with Classifier.load(), which does not need sklearn.
+
+        Folder contents:
+            classifier.json     {"format", "version", "model", "params",
+                                 "target", "classes", "features"}
+            coef.npy            float64 array: one row of coefficients per score
+            intercept.npy       float64 array: intercept of each score
+
+        Inputs:
+            path    str or Path: folder to create or overwrite
+        """
+        model = self.model
+        if not hasattr(model, "coef_"):
+            raise NotImplementedError(f"{modelname(model)} is not a linear model")
+        if list(model.classes_) != list(range(len(self.classes))):
+            raise ValueError("model was not trained on every class")
+
+        params = {
+            k: v
+            for k, v in self.params.items()
+            if isinstance(v, (bool, float, int, str, type(None)))
+        }
+
+        # Copy first: a loaded model may be memory-mapped from the files in path
+        coef = atleast_2d(array(model.coef_, dtype="float64"))
+        intercept = array(model.intercept_, dtype="float64").reshape(-1)
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        save(path / "coef.npy", coef)
+        save(path / "intercept.npy", intercept)
+
+        meta = {
+            "format": FORMAT,
+            "version": 1,
+            "model": modelname(model),
+            "params": params,
+            "target": self.target,
+            "classes": self.classes,
+            "features": self.features,
+        }
+        (path / "classifier.json").write_text(dumps(meta, indent=2))
+
+    def scores(self, values):
+        """numpy array: Linear decision function for each row of values."""
+        model = self.model
+
+        values = asarray(values, dtype="float64").reshape(-1, len(self.features))
+        scores = values @ atleast_2d(model.coef_).T  # binary Ridge coef_ is 1D
+        scores += asarray(model.intercept_).reshape(-1)
+
+        return scores
+
+
+class LinearModel:
+    """
+    Trained linear classifier scored with NumPy instead of sklearn.
+    Has the sklearn methods and attributes which Classifier uses.
+    Only models saved from LogisticRegression can predict probabilities.
+
+    Constructor inputs:
+        coef        2D float array: coefficients for each decision score
+        intercept   float array: intercept for each decision score
+        nclasses    int: number of classes
+        kind        str: name of the sklearn.linear_model this was saved from
+        params      dict: parameters of the original model
+    """
+
+    def __init__(self, coef, intercept, nclasses, kind, params):
+        self.classes_ = arange(nclasses)
+        self.coef_ = atleast_2d(coef)
+        self.intercept_ = intercept.reshape(-1)
+        self.kind = kind
+        self.multi_class = params.get("multi_class", "multinomial")
+        self.params = dict(params)
+        self.solver = params.get("solver")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.kind})"
+
+    def decision_function(self, values):
+        """numpy array: Linear decision scores for each row of values."""
+        values = asarray(values, dtype="float64")
+
+        return values @ self.coef_.T + self.intercept_
+
+    @property
+    def predict_proba(self):
+        """function: Predicted class probabilities if saved from LogisticRegression."""
+        if self.kind != "LogisticRegression":
+            raise AttributeError(f"{self.kind} cannot predict probabilities")
+
+        return self.probs
+
+    def get_params(self):
+        """dict: Parameters of the original model."""
+        return dict(self.params)
+
+    def predict(self, values):
+        """numpy int array: Predicted class code for each row of values."""
+        return scorecodes(self, self.decision_function(values))
+
+    def probs(self, values):
+        """numpy array: LogisticRegression class probabilities for each row."""
+        return scoreprobs(self, self.decision_function(values))
+
+
+class Metrics:
+    """
+    Classification metrics accumulated over one or more chunks of test data.
+    Update with integer class codes for true and predicted classes,
+    and optionally with predicted probabilities for each class.
+
+    Constructor inputs:
+        classes     list: class labels in the same order as class codes
+        target      str: name of true class column
+    """
+
+    def __init__(self, classes, target="true"):
+        nclasses = len(classes)
+
+        self.classes = list(classes)
+        self.counts = zeros((nclasses, nclasses), dtype="int64")
+        self.logloss = 0.0
+        self.nprobs = 0
+        self.target = target
+
+    def __repr__(self):
+        return f"{type(self).__name__} with {self.counts.sum()} rows"
+
+    def update(self, true, pred, probs=None):
+        """
+        None: Add one chunk of predictions.
+        Rows with true code -1 (unknown or missing class) are ignored.
+
+        Inputs:
+            true    int array: true class codes
+            pred    int array: predicted class codes
+            probs   optional 2D array: probability of each class for each row
+        """
+        nclasses = len(self.classes)
+
+        true, pred = asarray(true), asarray(pred)
+        known = true >= 0
+        true, pred = true[known], pred[known]
+        pairs = bincount(true * nclasses + pred, minlength=nclasses**2)
+        self.counts += pairs.reshape(nclasses, nclasses)
+
+        if probs is not None:
+            probs = asarray(probs)[known]
+            probs = probs[arange(len(true)), true].clip(1e-15, None)
+            self.logloss -= log(probs).sum()
+            self.nprobs += len(probs)
+
+    # Properties
+
+    @property
+    def confusion(self):
+        """DataFrame: Counts with true classes as rows and predictions as columns."""
+        confusion = DataFrame(self.counts, index=self.classes, columns=self.classes)
+        confusion.index.name = self.target
+        confusion.columns.name = "predicted"
+
+        return confusion
+
+    @property
+    def scores(self):
+        """DataFrame: Precision, recall, F1 score, and support for each class."""
+        counts = self.counts
+
+        correct = counts.diagonal()
+        support = counts.sum(axis=1)
+        predicted = counts.sum(axis=0)
+        precision = correct / predicted.clip(1, None)
+        recall = correct / support.clip(1, None)
+        f1 = 2 * precision * recall / (precision + recall).clip(1e-15, None)
+
+        return DataFrame(
+            {"precision": precision, "recall": recall, "f1": f1, "support": support},
+            index=self.classes,
+        )
+
+    @property
+    def summary(self):
+        """Series: Accuracy, macro-averaged scores, and mean log loss."""
+        counts = self.counts
+        scores = self.scores
+
+        summary = {
+            "rows": counts.sum(),
+            "accuracy": counts.trace() / max(1, counts.sum()),
+            "precision": scores["precision"].mean(),
+            "recall": scores["recall"].mean(),
+            "f1": scores["f1"].mean(),
+            "log_loss": (self.logloss / self.nprobs) if self.nprobs else float("nan"),
+        }
+
+        return Series(summary, name="metrics")
@@ -1,6 +1,120 @@
-from matplotlib.pyplot import figure
+from functools import cached_property, lru_cache, partial
+from time import perf_counter
+from warnings import warn
+
+from numpy import arange, argsort, ascontiguousarray, cumsum, empty, sort, sqrt
+from numpy import unique, zeros
 from pandas import Categorical, DataFrame, Index, Series
-from scipy.cluster.hierarchy import dendrogram, fcluster, linkage
+from scipy.cluster.hierarchy import dendrogram, fcluster, leaves_list, linkage
+from scipy.cluster.hierarchy import maxdists
+
+MAXBYTES = 2**30
+MAXCUTS = 256
+MAXREPS = 4096
+
+
+def fclusters(tree, n, kwargs=()):
+    """numpy int array: Read-only cluster number from 0 for each leaf of tree."""
+    labels = fcluster(tree, n, **dict(kwargs)) - 1
+    labels.flags.writeable = False
+
+    return labels
+
+
+def maxclusters(n, index):
+    """
+    numpy int array: Same as fclusters(tree, n) with criterion='maxclust'.
+    Each cluster is a range of leaves in dendrogram order, so clusters are
+    found by splitting that order at unmerged nodes in O(len(tree)) time.
+    Clusters are numbered in the same order as scipy's fcluster().
+
+    Inputs:
+        n       int: maximum number of distinct clusters
+        index   tuple: output of treeindex(tree)
+    """
+    children, stamps, starts, leafpos, dists, sortdists = index
+    nleaves = len(leafpos)
+    nmerged = nleaves - min(n, nleaves)
+    if not nmerged:
+        return arange(nleaves)
+
+    merged = dists <= sortdists[nmerged - 1]
+    if merged.all():
+        return zeros(nleaves, dtype="int64")
+
+    roots = children[~merged].ravel()
+    roots = roots[(roots < nleaves) | merged[(roots - nleaves).clip(0, None)]]
+    roots = roots[argsort(starts[roots])]
+
+    numbers = empty(len(roots), dtype="int64")
+    numbers[argsort(stamps[roots])] = arange(len(roots))
+    splits = zeros(nleaves, dtype="int64")
+    splits[starts[roots][1:]] = 1
+
+    return numbers[cumsum(splits)][leafpos]
+
+
+def pdistbytes(nrows):
+    """int: Bytes of RAM needed for pairwise distances between nrows rows."""
+    return 8 * nrows * (nrows - 1) // 2
+
+
+def represented(data, nreps, metric="euclidean", seed=0):
+    """
+    (numpy int array, DataFrame): Representative of each row, and representatives.
+    Rows are grouped with mini-batch k-means. Representatives are group means.
+    Rows are scaled to unit length before grouping if metric is 'cosine'.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    values = data.to_numpy("float64")
+    if metric == "cosine":
+        values = values / sqrt((values**2).sum(axis=1, keepdims=True)).clip(1e-12)
+
+    kmeans = MiniBatchKMeans(nreps, batch_size=4096, n_init=3, random_state=seed)
+    groups = unique(kmeans.fit_predict(values), return_inverse=True)[1]
+    reps = data.groupby(groups).mean()
+
+    return groups, reps
+
+
+def treeindex(tree):
+    """
+    tuple of arrays: Tree structure for maxclusters().
+    children    int array: left and right child of each merge
+    stamps      int array: order in which fcluster() numbers each node
+    starts      int array: first dendrogram position of each node's leaves
+    leafpos     int array: dendrogram position of each leaf
+    dists       float array: max merge distance inside each merged node
+    sortdists   float array: sorted dists
+    """
+    nleaves = len(tree) + 1
+    children = tree[:, :2].astype("int64")
+
+    # fcluster() numbers merges on the way down, then leaves on the way back up
+    stamps = empty(2 * nleaves - 1, dtype="int64")
+    stack, stamp = [(2 * nleaves - 2, False)], 0
+    while stack:
+        node, back = stack.pop()
+        kids = children[node - nleaves]
+        if back:
+            for kid in kids[kids < nleaves]:
+                stamps[kid], stamp = stamp, stamp + 1
+        else:
+            stamps[node], stamp = stamp, stamp + 1
+            stack.append((node, True))
+            stack.extend((kid, False) for kid in kids[::-1] if kid >= nleaves)
+
+    leafpos = empty(nleaves, dtype="int64")
+    leafpos[leaves_list(tree)] = arange(nleaves)
+    starts = empty(2 * nleaves - 1, dtype="int64")
+    starts[:nleaves] = leafpos
+    for i, kids in enumerate(children):
+        starts[nleaves + i] = starts[kids].min()
+
+    dists = maxdists(tree)
+
+    return children, stamps, starts, leafpos, dists, sort(dists)
 
 
 class Hierarchy:
@@ -9,18 +123,29 @@ class Hierarchy:
     Construct with a DataFrame. Non-numeric columns are ignored.
     Call to return a Series assigning each row to a cluster.
 
+    Exact clustering needs RAM for all pairwise distances between rows.
+    For large data, rows are first grouped into nreps representatives,
+    then representatives are clustered and each row joins its representative.
+    If nreps is None, representatives are used only if exact clustering
+    would need more than maxbytes of RAM.
+
     Constructor inputs:
         data        DataFrame: observations to use for training
+        nreps       int or None: number of representatives (0 for exact)
+        maxbytes    int: RAM budget for pairwise distances
+        callback    callable: called with time for each stage (see probe)
         **kwargs    are passed to scipy.cluster.hierarchy.linkage()
 
     Call inputs:
         n           int: maximum number of distinct clusters
         **kwargs    are passed to scipy.cluster.hierarchy.fcluster()
 
+    Recent calls are cached. See .cuts.cache_info() for cache statistics.
+
     See scipy.cluster.hierarchy docs for more information.
     """
 
-    def __init__(self, data, **kwargs):
+    def __init__(self, data, nreps=None, maxbytes=MAXBYTES, callback=None, **kwargs):
         kwargs = {
             "method": "weighted",
             "metric": "cosine",
@@ -28,23 +153,42 @@ class Hierarchy:
         } | kwargs
 
         data = data.select_dtypes("number")
-        links = DataFrame(linkage(data, **kwargs))
-        links.columns = "left right distance count".split()
-        for c in links.columns.drop("distance"):
-            links[c] = links[c].astype(int)
+        nrows = len(data)
+        if (nreps is None) and (pdistbytes(nrows) > maxbytes):
+            nreps = min(MAXREPS, int((1 + sqrt(1 + maxbytes)) / 2))
+            gib = pdistbytes(nrows) / 2**30
+            warn(f"{nrows} rows need {gib:.1f} GiB. Using {nreps} representatives.")
+
+        start = perf_counter()
+        if nreps and (nreps < nrows):
+            groups, reps = represented(data, nreps, kwargs["metric"])
+            if callback is not None:
+                callback("represent", perf_counter() - start, rows=nrows)
+        else:
+            groups, reps = arange(nrows), data
+
+        start = perf_counter()
+        tree = ascontiguousarray(linkage(reps, **kwargs), dtype="float64")
+        if callback is not None:
+            callback("linkage", perf_counter() - start, rows=len(reps))
 
+        self.cuts = lru_cache(MAXCUTS)(partial(fclusters, tree))
         self.features = data.columns.copy()
+        self.groups = groups
         self.leaves = data.index.copy()
-        self.links = links
+        self.tree = tree
 
     def __call__(self, n, **kwargs):
+        cuts = self.cuts
+        groups = self.groups
         leaves = self.leaves
-        links = self.links
 
-        kwargs = {"criterion": "maxclust"} | kwargs
-
-        cluster = fcluster(links, n, **kwargs) - 1
-        cluster = Series(cluster, index=leaves, name="cluster")
+        kwargs = tuple(sorted(({"criterion": "maxclust"} | kwargs).items()))
+        try:
+            cluster = cuts(n, kwargs)
+        except TypeError:  # unhashable kwargs
+            cluster = fclusters(self.tree, n, kwargs)
+        cluster = Series(cluster[groups], index=leaves, name="cluster")
 
         return cluster
 
@@ -54,9 +198,29 @@ class Hierarchy:
     def __repr__(self):
         return f"{type(self).__name__} with {len(self)} leaves"
 
+    @property
+    def exact(self):
+        """bool: Is each leaf its own representative?"""
+        return len(self.tree) + 1 == len(self.leaves)
+
+    @cached_property
+    def index(self):
+        """tuple: Arrays for finding many maxclust cuts quickly."""
+        return treeindex(self.tree)
+
+    @property
+    def links(self):
+        """DataFrame: Linkage matrix with one row per merge."""
+        links = DataFrame(self.tree, columns="left right distance count".split())
+        for c in links.columns.drop("distance"):
+            links[c] = links[c].astype(int)
+
+        return links
+
     def plot(self, n=0, figsize=(9, 3), **kwargs):
         """
         matplotlib Axes: Plot a tree of hierarchical clusters.
+        Leaves are representatives if clustering is not exact.
 
         Inputs
             n           int: number of clusters to show
@@ -64,10 +228,12 @@ class Hierarchy:
 
             **kwargs    are passed to scipy.cluster.hierarchy.dendrogram
         """
-        leaves = self.leaves
-        links = self.links
+        from matplotlib.pyplot import figure
+
+        leaves = self.leaves if self.exact else None
+        tree = self.tree
 
-        n = int(n) or len(leaves)
+        n = int(n) or (len(tree) + 1)
         kwargs = {
             "color_threshold": 0.5,
             "count_sort": False,
@@ -82,6 +248,26 @@ class Hierarchy:
         axes.set_xlabel(f"cluster")
         axes.set_ylabel("distance")
 
-        dendrogram(links, n, ax=axes, **kwargs)
+        dendrogram(tree, n, ax=axes, **kwargs)
 
         return axes
+
+    def sweep(self, ns):
+        """
+        DataFrame: Cluster number of each row for each maximum number of clusters.
+        Columns are the same as calling with each n in ns (criterion='maxclust'),
+        but all cuts share one pass over the tree and no fcluster() calls.
+
+        Inputs
+            ns          iterable of ints: maximum numbers of distinct clusters
+        """
+        groups = self.groups
+        index = self.index
+
+        ns = list(ns)
+        dtype = "int32" if (len(self.tree) < 2**31) else "int64"
+        labels = empty((len(groups), len(ns)), dtype=dtype)
+        for i, n in enumerate(ns):
+            labels[:, i] = maxclusters(n, index)[groups]
+
+        return DataFrame(labels, index=self.leaves, columns=Index(ns, name="n"))
@@ -1,9 +1,224 @@
-from numpy import fromiter, linspace, tanh
-from numpy.random import randn
-from pandas import Categorical, DataFrame
-from scipy.sparse import coo_matrix, diags
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, wraps
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from time import perf_counter
+
+from numpy import (
+    add,
+    arange,
+    asarray,
+    bincount,
+    cumsum,
+    diff,
+    empty,
+    flatnonzero,
+    floor,
+    isnan,
+    linspace,
+    minimum,
+    ones,
+    r_,
+    repeat,
+    searchsorted,
+    sqrt,
+    tanh,
+    unique,
+    where,
+    zeros,
+)
+from numpy import load, random, save
+from numpy.linalg import norm
+from numpy.random import SeedSequence, default_rng
+from pandas import Categorical, CategoricalDtype, DataFrame, Index, read_csv
+from scipy.sparse import coo_matrix, csr_matrix, diags
 from scipy.sparse.csgraph import laplacian
 
+EXACTMAX = 1024
+MINSTEPS = 16
+FORMAT = "GraphFrame"
+
+Link = namedtuple("Link", "source target weight")
+LinkArrays = namedtuple("LinkArrays", "indptr indices weights nodes")
+LinkArrays.__doc__ = """
+Compact links in CSR format: targets of node i are nodes[indices[a:b]]
+with weights[a:b], where a, b = indptr[i], indptr[i + 1].
+Indices are int32 and weights are int32 or float32 when possible.
+"""
+
+
+def balanced(pull, push):
+    """
+    float: Scale factor which minimizes net force on points.
+    Springs pull harder and 1/distance forces push softer as points spread out.
+    """
+    pull, push = norm(pull), norm(push)
+
+    return sqrt(push / pull) if (pull and push) else 1.0
+
+
+def cached(method):
+    """
+    property: Compute once per set of links and store result in self.cache.
+    Counts cache hits and misses in self.hits and self.misses.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def getter(self):
+        cache = self.cache
+        if name in cache:
+            self.hits[name] += 1
+        else:
+            self.misses[name] += 1
+            cache[name] = method(self)
+
+        return cache[name]
+
+    return property(getter)
+
+
+def layout(
+    matrix,
+    springs,
+    nsteps=128,
+    engine="auto",
+    theta=0.5,
+    start=None,
+    tol=0,
+    rng=random,
+    callback=None,
+):
+    """
+    (numpy complex128 array, int): Layout points and number of steps used.
+    Inputs are a sparse adjacency matrix, its spring matrix, and start points
+    with NaN for unknown points. Other inputs are the same as GraphFrame().
+    """
+    npoints = matrix.shape[0]
+    repulse = repulsion(engine, npoints, theta)
+
+    if start is None:
+        points = randomz(npoints, rng)
+        speeds = linspace(1, 0.1, nsteps - 1)
+    else:
+        points = warmz(matrix, start, rng)
+        points *= balanced(springs.dot(points), repulse(points))
+        speeds = linspace(0.1, 0.1, nsteps - 1)
+
+    return relaxed(springs, points, speeds, repulse, tol, callback)
+
+
+def layoutcsr(job):
+    """(numpy complex128 array, int): layout() inputs from (arrays, kwargs, seed)."""
+    (data, indices, indptr), kwargs, seed = job
+    n = len(indptr) - 1
+    matrix = csr_matrix((data, indices, indptr), shape=(n, n))
+
+    return layout(matrix, springmatrix(matrix), rng=default_rng(seed), **kwargs)
+
+
+def layout_many(graphs, seed=None, workers=None, chunksize=1, **kwargs):
+    """
+    list of DataFrames: Layout of each graph in the same order as input graphs.
+    Only sparse matrix arrays are sent to worker processes.
+    Each graph gets its own random generator, so results depend on seed
+    but not on the number of workers.
+
+    Inputs:
+        graphs      iterable of GraphFrames
+        seed        int or None: seed for numpy.random.SeedSequence
+        workers     int or None: number of processes (1 to run in this process)
+        chunksize   int: number of graphs to send to a worker at a time
+        kwargs      are passed to GraphFrame() (except start)
+    """
+    graphs = list(graphs)
+    seeds = SeedSequence(seed).spawn(len(graphs))
+    arrays = ((g.matrix.data, g.matrix.indices, g.matrix.indptr) for g in graphs)
+    jobs = ((x, kwargs, s) for x, s in zip(arrays, seeds))
+
+    if workers == 1:
+        results = list(map(layoutcsr, jobs))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(layoutcsr, jobs, chunksize=chunksize))
+
+    return [unitframe(p, g.nodes, nsteps=n) for g, (p, n) in zip(graphs, results)]
+
+
+def framed(indptr, indices, weights, nodes):
+    """DataFrame: Links with categorical [source, target] from CSR arrays."""
+    cats = CategoricalDtype(nodes)
+    sources = repeat(arange(len(nodes)), diff(indptr))
+
+    return DataFrame(
+        {
+            "source": Categorical.from_codes(sources, dtype=cats),
+            "target": Categorical.from_codes(indices, dtype=cats),
+            "weight": weights,
+        }
+    )
+
+
+def linkarrays(matrix, nodes):
+    """LinkArrays: Compact CSR arrays from a sorted sparse matrix and node labels."""
+    itype = "int32" if (max(matrix.shape[0], matrix.nnz) < 2**31) else "int64"
+    weights = matrix.data
+    if weights.dtype.kind in "iu":
+        if len(weights) and (abs(weights).max() < 2**31):
+            weights = weights.astype("int32")
+    elif weights.dtype.kind == "f":
+        weights = weights.astype("float32")
+
+    return LinkArrays(
+        matrix.indptr.astype(itype),
+        matrix.indices.astype(itype),
+        weights,
+        Index(nodes),
+    )
+
+
+def loadlayout(path, mmap=True):
+    """DataFrame or None: ['x', 'y'] layout saved with GraphFrame.save()."""
+    path = Path(path)
+    if not (path / "layout.npy").exists():
+        return None
+
+    mode = "r" if mmap else None
+    nodes = load(path / "nodes.npy", mmap_mode=mode)
+    xy = load(path / "layout.npy", mmap_mode=mode)
+
+    return DataFrame(xy, columns=["x", "y"], index=Index(nodes))
+
+
+def matched(matrix, nrounds=4, rng=random):
+    """
+    numpy int array: Group number for each node after heavy-link matching.
+    Each group is one node or a pair of linked nodes.
+    Each round pairs unmatched nodes whose heaviest links point to each other.
+    """
+    n = matrix.shape[0]
+    nodes = arange(n)
+    heavy = abs(matrix) + abs(matrix).T
+    heavy = (heavy - diags(heavy.diagonal())).tocsr()
+
+    mates = nodes.copy()
+    for _ in range(nrounds):
+        free = diags((mates == nodes).astype("float64"))
+        free = (free @ heavy @ free).tocsr()
+        free.eliminate_zeros()
+        linked = diff(free.indptr) > 0
+        if not linked.any():
+            break
+
+        best = free.multiply(1 + 1e-9 * rng.random(n)).tocsr()  # break ties randomly
+        best = asarray(best.argmax(axis=1)).ravel()
+        mutual = linked & (best[best] == nodes)
+        mates[mutual] = best[mutual]
+
+    return unique(minimum(nodes, mates), return_inverse=True)[1]
+
 
 def radlimited(z, maxrad):
     """numpy array: z with magnitudes smoothly compressed to <= maxrad."""
@@ -12,18 +227,244 @@ def radlimited(z, maxrad):
     return z * maxrad * tanh(rad) / rad
 
 
-def randomz(n):
+def randomz(n, rng=random):
     """numpy complex128 array: Random points inside unit square."""
-    return randn(n).astype("complex128") + 1j * randn(n).astype("complex128")
+    return rng.standard_normal(n) + 1j * rng.standard_normal(n)
+
+
+def reindexed(matrix, nodes, newnodes):
+    """scipy.sparse.csr: Square matrix with rows and columns moved to newnodes."""
+    if Index(nodes).equals(Index(newnodes)):
+        return matrix.copy()
+
+    n = len(newnodes)
+    idx = Index(newnodes).get_indexer(nodes)
+    coo = matrix.tocoo()
+
+    return coo_matrix((coo.data, (idx[coo.row], idx[coo.col])), shape=(n, n)).tocsr()
+
+
+def relaxed(springs, points, speeds, repulse, tol=0, callback=None, minsteps=0):
+    """
+    (numpy complex128 array, int): Points moved by forces, and number of steps.
+    Runs one step per speed. After minsteps, stops early when the mean distance
+    moved is less than tol times the maximum distance from any point to the center.
+
+    If callback is given, then it is called after each step with
+    callback(stage, seconds, step=step) for the springs, repel, and radlimited
+    stages, then callback('step', seconds, ...) with speed, energy (mean squared
+    net force), displacement (mean distance moved), and radius.
+    """
+    points = asarray(points, dtype="complex128").copy()
+
+    nsteps = 0
+    for speed in speeds:
+        t0 = perf_counter()
+        pull = springs.dot(points)
+        t1 = perf_counter()
+        force = pull + repulse(points)
+        t2 = perf_counter()
+        step = radlimited(force, speed)
+        t3 = perf_counter()
+        points += step
+        nsteps += 1
+
+        moved = abs(step).mean()
+        radius = abs(points - points.mean()).max()
+        if callback is not None:
+            callback("springs", t1 - t0, step=nsteps)
+            callback("repel", t2 - t1, step=nsteps)
+            callback("radlimited", t3 - t2, step=nsteps)
+            callback(
+                "step",
+                perf_counter() - t0,
+                step=nsteps,
+                speed=speed,
+                energy=(force * force.conj()).real.mean(),
+                displacement=moved,
+                radius=radius,
+            )
+        if (nsteps >= minsteps) and (moved <= tol * radius):
+            break
+
+    return points, nsteps
+
+
+def repulsion(engine="auto", npoints=0, theta=0.5):
+    """
+    callable: Function which inputs points and outputs repulsive forces.
+
+    Inputs:
+        engine  str: 'exact', 'barneshut', or 'auto' to choose by npoints
+                OR callable: returned as-is
+        npoints int: number of points to be repelled
+        theta   float: Barnes-Hut accuracy parameter (0 is exact)
+    """
+    if callable(engine):
+        return engine
+    if engine == "auto":
+        engine = "exact" if (npoints <= EXACTMAX) else "barneshut"
+    if engine == "exact":
+        return repel
+    if engine == "barneshut":
+        return partial(barneshut, theta=theta)
+
+    raise ValueError(f"unknown repulsion engine: {engine}")
+
+
+def repel(points, blocksize=2**22):
+    """
+    numpy complex128 array: 1/distance repulsive force on each point.
+    Exact pairwise forces, computed in blocks of at most blocksize pairs.
+    """
+    points = asarray(points, dtype="complex128")
+    npoints = len(points)
+    nrows = max(1, blocksize // max(1, npoints))
+
+    forces = empty(npoints, dtype="complex128")
+    for i in range(0, npoints, nrows):
+        z = points[i : i + nrows, None] - points[None, :]
+        z /= (z * z.conj()).real.clip(1e-9, None)
+        forces[i : i + nrows] = z.mean(axis=1)
+
+    return forces
+
+
+def barneshut(points, theta=0.5, maxdepth=16):
+    """
+    numpy complex128 array: Approximate repel() forces with a Barnes-Hut quadtree.
+    Each distant cell acts like all of its points are at its center of mass.
+    A cell is distant if (cell width) < theta * (distance to center of mass).
+    Set theta=0 for exact forces. Larger theta is faster but less accurate.
+    """
+    points = asarray(points, dtype="complex128")
+    npoints = len(points)
+    if not npoints:
+        return empty(0, dtype="complex128")
+
+    # Sort points by Morton code on a (2**maxdepth x 2**maxdepth) grid
+    x, y = points.real, points.imag
+    width = max(x.max() - x.min(), y.max() - y.min(), 1e-9)
+    ncells = 2**maxdepth
+    ix = floor((x - x.min()) * (ncells / width)).clip(0, ncells - 1).astype("int64")
+    iy = floor((y - y.min()) * (ncells / width)).clip(0, ncells - 1).astype("int64")
+    codes = zeros(npoints, dtype="int64")
+    for bit in range(maxdepth):
+        codes |= ((ix >> bit) & 1) << (2 * bit)
+        codes |= ((iy >> bit) & 1) << (2 * bit + 1)
+    order = codes.argsort(kind="stable")
+    codes, points = codes[order], points[order]
+
+    # Build tree levels: first point, point count, and center of mass per cell
+    levels = []
+    for depth in range(maxdepth + 1):
+        keys = codes >> (2 * (maxdepth - depth))
+        first = flatnonzero(r_[True, keys[1:] != keys[:-1]])
+        count = diff(r_[first, npoints])
+        center = add.reduceat(points, first) / count
+        levels.append((keys[first], first, count, center))
+        if count.max() == 1:
+            break
+
+    # Walk down tree with all (point, cell) pairs at the same depth
+    forces = zeros(npoints, dtype="complex128")
+    pts, cells = arange(npoints), zeros(npoints, dtype="int64")
+    for depth, (keys, first, count, center) in enumerate(levels):
+        z = points[pts] - center[cells]
+        rr = (z * z.conj()).real
+        far = (count[cells] == 1) | ((width / 2**depth) ** 2 < theta**2 * rr)
+        z = count[cells[far]] * z[far] / rr[far].clip(1e-9, None)
+        forces += bincount(pts[far], z.real, npoints)
+        forces += 1j * bincount(pts[far], z.imag, npoints)
+        pts, cells = pts[~far], cells[~far]
+
+        if depth + 1 < len(levels):
+            kids = levels[depth + 1][0]
+            lo = searchsorted(kids, keys << 2)
+            nkids = searchsorted(kids, (keys << 2) + 4) - lo
+            pts, cells = repeat(pts, nkids[cells]), spread(lo[cells], nkids[cells])
+        elif len(pts):
+            pts, near = repeat(pts, count[cells]), spread(first[cells], count[cells])
+            z = points[pts] - points[near]
+            z /= (z * z.conj()).real.clip(1e-9, None)
+            forces += bincount(pts, z.real, npoints)
+            forces += 1j * bincount(pts, z.imag, npoints)
+
+    result = empty(npoints, dtype="complex128")
+    result[order] = forces / npoints
+
+    return result
+
+
+def saved(path, array):
+    """
+    None: Save array as a .npy file via a temporary file in the same folder.
+    Arrays memory-mapped from path stay valid, so graphs and layouts
+    loaded from a folder can be saved back to the same folder.
+    """
+    temp = path.with_name(f".{path.name}.tmp")
+    with open(temp, "wb") as file:
+        save(file, array)
+    replace(temp, path)
+
+
+def spread(starts, lengths):
+    """numpy int array: Concatenated ranges [start, start + length)."""
+    offsets = cumsum(lengths) - lengths
+
+    return repeat(starts - offsets, lengths) + arange(lengths.sum())
+
+
+def springmatrix(matrix):
+    """scipy.sparse.csr: Spring force matrix for a sparse adjacency matrix."""
+    springs = matrix - diags(matrix.diagonal())  # remove loops
+    springs *= matrix.shape[0] / springs.sum()  # normalize spring constants
+    springs = -1 * laplacian(springs, use_out_degree=True)
 
+    return springs
 
-def repel(points):
-    """numpy complex128 array: 1/distance repulsive force on each point."""
-    forces = (z - points for z in points)
-    forces = (z / (z * z.conj()).real.clip(1e-9, None) for z in forces)
-    forces = (z.mean() for z in forces)
 
-    return fromiter(forces, count=len(points), dtype="complex128")
+def unitframe(points, nodes, **attrs):
+    """DataFrame: ['x', 'y'] coordinates recentered and scaled to the unit circle."""
+    points = points - points.mean()
+    points /= abs(points).max()
+
+    frame = DataFrame({"x": points.real, "y": points.imag}, index=nodes)
+    frame.attrs.update(attrs)
+
+    return frame
+
+
+def unpacked(arrays):
+    """Generate namedtuples: (source, target, weight) for each link in LinkArrays."""
+    indptr, indices, weights, nodes = arrays
+    for i in flatnonzero(diff(indptr)):
+        a, b = indptr[i], indptr[i + 1]
+        for target, weight in zip(nodes[indices[a:b]], weights[a:b].tolist()):
+            yield Link(nodes[i], target, weight)
+
+
+def warmz(matrix, points, rng=random):
+    """
+    numpy complex128 array: Copy of points with NaN points filled in.
+    Missing points are moved to the mean of their linked neighbors,
+    or to random positions if none of their neighbors are known.
+    """
+    points = asarray(points, dtype="complex128").copy()
+    missing = isnan(points)
+    if not missing.any():
+        return points
+
+    linked = abs(matrix.sign())
+    linked = (linked + linked.T).tocsr()
+    total = linked.dot(where(missing, 0, points))
+    count = linked.dot((~missing).astype("float64"))
+
+    guess = total / count.clip(1, None)
+    guess[count == 0] = randomz(int((count == 0).sum()), rng)
+    points[missing] = guess[missing]
+
+    return points
 
 
 class GraphFrame:
@@ -33,13 +474,21 @@ class GraphFrame:
     If no weights are given, then links are weighted by how often they appear.
     Links with weight zero will be dropped.
 
+    Matrices, nodes, and degrees are cached until .links is reassigned.
+    Call .cache.clear() after modifying .links in place.
+    See .cachestats for cache hits and misses.
+
+    Compact graphs store links as LinkArrays instead of a DataFrame.
+    They use less memory, but build a new .links DataFrame on every access.
+
     Inputs:
         DataFrame with [source, target, weight] as first 3 columns, OR
         DataFrame with [source, target] as first 2 columns, OR
         anything that pandas.DataFrame() can convert to one of the above
+        compact     bool: store links as LinkArrays?
     """
 
-    def __init__(self, links):
+    def __init__(self, links, compact=False):
         links = DataFrame(links)
 
         cols = list(links.columns)
@@ -52,34 +501,64 @@ class GraphFrame:
         links["source"] = Categorical(links["source"], categories=cats)
         links["target"] = Categorical(links["target"], categories=cats)
 
+        self.hits = Counter()
+        self.misses = Counter()
         self.links = links
-
-    def __call__(self, nsteps=128):
+        if compact:
+            self.arrays = linkarrays(self.matrix, self.nodes)
+
+    def __call__(
+        self,
+        nsteps=128,
+        engine="auto",
+        theta=0.5,
+        start=None,
+        tol=0,
+        seed=None,
+        callback=None,
+    ):
         """
         DataFrame: Calculate ['x', 'y'] coordinates for each node.
         Nodes are recentered and scaled to fit in the unit circle.
-        Initial positions are random in the unit square.
+        Initial positions are random in the unit square unless start is given.
+        Number of steps actually used is saved in .attrs['nsteps'].
+
+        Inputs:
+            nsteps      int: maximum number of layout steps
+            engine      str or callable: repulsion engine (see repulsion)
+            theta       float: Barnes-Hut accuracy parameter (0 is exact)
+            start       DataFrame: ['x', 'y'] coordinates from a previous layout
+            tol         float: stop when mean step < tol * layout radius
+            seed        int: seed for a numpy.random.Generator (default: global RNG)
+            callback    callable: called with timings after each step (see probe)
+
+        Layouts from a start position run at low speed, so a few steps
+        are often enough to update the layout of a slightly changed graph.
         """
         nodes = self.nodes
-        springs = self.springs
+        rng = random if (seed is None) else default_rng(seed)
 
-        points = randomz(len(nodes))
-        for speed in linspace(1, 0.1, nsteps - 1):
-            forces = springs.dot(points) + repel(points)
-            points += radlimited(forces, speed)
+        if start is not None:
+            start = DataFrame(start).reindex(nodes)
+            start = (start["x"] + 1j * start["y"]).to_numpy()
 
-        points -= points.mean()
-        points /= abs(points).max()
+        matrix, springs = self.matrix, self.springs
+        points, used = layout(
+            matrix, springs, nsteps, engine, theta, start, tol, rng, callback
+        )
 
-        return DataFrame({"x": points.real, "y": points.imag}, index=nodes)
+        return unitframe(points, nodes, nsteps=used)
 
     def __iter__(self):
         """Iterable of namedtuples: (source, target, weight) for each link."""
-        return self.links.itertuples(index=False, name="Link")
+        if not self.compact:
+            return self.links.itertuples(index=False, name="Link")
+
+        return unpacked(self.arrays)
 
     def __len__(self):
         """int: Number of links in graph."""
-        return len(self.links)
+        return len(self.arrays.indices) if self.compact else len(self.links)
 
     def __repr__(self):
         return f"{type(self).__name__} with {len(self)} links"
@@ -107,6 +586,102 @@ class GraphFrame:
 
         return cls.from_targets(targets)
 
+    @classmethod
+    def from_chunks(cls, chunks, compact=False):
+        """
+        GraphFrame: New graph from an iterable of link DataFrames.
+        Each chunk has the same columns as the GraphFrame constructor input.
+        Weights are summed into a sparse matrix as chunks arrive,
+        so memory use depends on the number of distinct links.
+        """
+        nodes = Index([])
+        matrix = csr_matrix((0, 0), dtype="int64")
+        for chunk in chunks:
+            chunk = DataFrame(chunk)
+            cols = list(chunk.columns)
+            src, tgt = chunk[cols[0]].to_numpy(), chunk[cols[1]].to_numpy()
+            wts = (
+                chunk[cols[2]].to_numpy()
+                if (len(cols) > 2)
+                else ones(len(src), "int64")
+            )
+
+            nodes = nodes.append(Index(r_[src, tgt]).unique().difference(nodes))
+            n = len(nodes)
+            i, j = nodes.get_indexer(src), nodes.get_indexer(tgt)
+
+            matrix.resize((n, n))
+            matrix = matrix + coo_matrix((wts, (i, j)), shape=(n, n)).tocsr()
+
+        return cls.from_matrix(matrix, nodes, compact)
+
+    @classmethod
+    def from_csv(cls, path, chunksize=2**20, compact=False, **kwargs):
+        """
+        GraphFrame: New graph from a CSV file of links read in chunks.
+        CSV columns are the same as the GraphFrame constructor input.
+        kwargs are passed to pandas.read_csv().
+        """
+        with read_csv(path, chunksize=chunksize, **kwargs) as chunks:
+            return cls.from_chunks(chunks, compact)
+
+    @classmethod
+    def from_matrix(cls, matrix, nodes, compact=False):
+        """
+        GraphFrame: New graph from a square sparse adjacency matrix.
+        Rows are sources and columns are targets, both labeled by nodes.
+        Nodes without any nonzero links will be dropped.
+        """
+        matrix = csr_matrix(matrix, copy=True)
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+
+        nodes = Index(nodes)
+        keep = (matrix.getnnz(axis=0) + matrix.getnnz(axis=1)) > 0
+        if not (keep.all() and nodes.is_monotonic_increasing):
+            order = nodes.argsort()
+            order = order[keep[order]]
+            matrix, nodes = matrix[order][:, order], nodes[order]
+        matrix.sort_indices()
+
+        graph = cls.__new__(cls)
+        graph.hits = Counter()
+        graph.misses = Counter()
+        if compact:
+            graph.arrays = linkarrays(matrix, nodes)
+        else:
+            graph.links = framed(matrix.indptr, matrix.indices, matrix.data, nodes)
+            graph.cache["matrix"] = matrix
+
+        return graph
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        GraphFrame: Compact graph from a folder written by GraphFrame.save().
+        If mmap, then arrays are memory-mapped read-only instead of read.
+        Processes which load the same folder share one copy in memory.
+        """
+        path = Path(path)
+        meta = loads((path / "graph.json").read_text())
+        if meta.get("format") != FORMAT:
+            raise ValueError(f"not a saved GraphFrame: {path}")
+
+        mode = "r" if mmap else None
+        arrays = LinkArrays(
+            load(path / "indptr.npy", mmap_mode=mode),
+            load(path / "indices.npy", mmap_mode=mode),
+            load(path / "weights.npy", mmap_mode=mode),
+            Index(load(path / "nodes.npy", mmap_mode=mode)),
+        )
+
+        graph = cls.__new__(cls)
+        graph.hits = Counter()
+        graph.misses = Counter()
+        graph.arrays = arrays
+
+        return graph
+
     @classmethod
     def from_sources(cls, sources):
         """GraphFrame: New graph from {node: [iterable of sources]} mapping."""
@@ -120,11 +695,43 @@ class GraphFrame:
     # Properties
 
     @property
+    def arrays(self):
+        """LinkArrays or None: Compact links, if this graph is compact."""
+        return self._arrays
+
+    @arrays.setter
+    def arrays(self, arrays):
+        """None: Replace links with compact arrays and clear cached properties."""
+        self._arrays = arrays
+        self._links = None
+        self.cache = dict()
+
+    @property
+    def cachestats(self):
+        """DataFrame: Hits, misses, and current status of each cached property."""
+        hits, misses = self.hits, self.misses
+        names = sorted(set(hits) | set(misses) | set(self.cache))
+
+        return DataFrame(
+            {
+                "hits": [hits[x] for x in names],
+                "misses": [misses[x] for x in names],
+                "cached": [x in self.cache for x in names],
+            },
+            index=names,
+        )
+
+    @property
+    def compact(self):
+        """bool: Are links stored as LinkArrays?"""
+        return self._arrays is not None
+
+    @cached
     def degin(self):
         """Series: Total weight pointing into each node."""
         return self.links.groupby("target", observed=False)["weight"].sum()
 
-    @property
+    @cached
     def degout(self):
         """Series: Total weight pointing out of each node."""
         return self.links.groupby("source", observed=False)["weight"].sum()
@@ -132,11 +739,28 @@ class GraphFrame:
     @property
     def flipped(self):
         """GraphFrame: New graph with all links reversed."""
-        return type(self)(self.links[["target", "source", "weight"]])
+        return self.from_matrix(self.matrix.T, self.nodes, self.compact)
 
     @property
+    def links(self):
+        """DataFrame: Aggregated [source, target, weight] links."""
+        return framed(*self.arrays) if self.compact else self._links
+
+    @links.setter
+    def links(self, links):
+        """None: Replace links and clear all cached properties."""
+        self._links = links
+        self._arrays = None
+        self.cache = dict()
+
+    @cached
     def matrix(self):
         """scipy.sparse.csr: Sparse adjacency matrix."""
+        if self.compact:
+            indptr, indices, weights, nodes = self.arrays
+            n = len(nodes)
+            return csr_matrix((weights, indices, indptr), shape=(n, n), copy=False)
+
         links = self.links
 
         n = len(links["source"].cat.categories)
@@ -146,41 +770,209 @@ class GraphFrame:
 
         return coo_matrix((k, (i, j)), shape=(n, n)).tocsr()
 
-    @property
+    @cached
     def nodes(self):
         """list: Sorted union of sources and targets."""
+        if self.compact:
+            return self.arrays.nodes.tolist()
+
         return self.links["source"].cat.categories.tolist()
 
-    @property
+    @cached
     def springs(self):
         """scipy.sparse.csr: Spring force matrix."""
-        matrix = self.matrix
-
-        springs = matrix - diags(matrix.diagonal())  # remove loops
-        springs *= matrix.shape[0] / springs.sum()  # normalize spring constants
-        springs = -1 * laplacian(springs, use_out_degree=True)
+        return springmatrix(self.matrix)
 
-        return springs
-
-    @property
+    @cached
     def weights(self):
         """Series: Weight of each (source, target) pair."""
         return self.links.groupby(["source", "target"], observed=True)["weight"].sum()
 
+    # Modifiers
+
+    def add_links(self, links):
+        """
+        None: Add links to graph in place without rebuilding existing links.
+        Inputs are the same as the GraphFrame constructor.
+        Weights are added to existing links. Links with weight zero are dropped.
+        """
+        other = type(self)(links)
+        nodes = Index(self.nodes).union(Index(other.nodes))
+
+        matrix = reindexed(self.matrix, self.nodes, nodes)
+        matrix += reindexed(other.matrix, other.nodes, nodes)
+
+        self.replace(self.from_matrix(matrix, nodes, self.compact))
+
+    def remove_links(self, pairs):
+        """
+        None: Remove links from graph in place without rebuilding other links.
+        Inputs are (source, target) pairs in anything DataFrame() can convert.
+        Pairs which are not in the graph are ignored.
+        """
+        pairs = DataFrame(pairs)
+        if pairs.empty:
+            return
+
+        cols = list(pairs.columns)
+        nodes = Index(self.nodes)
+        matrix = self.matrix
+
+        i = nodes.get_indexer(pairs[cols[0]])
+        j = nodes.get_indexer(pairs[cols[1]])
+        found = (i >= 0) & (j >= 0)
+        i, j = i[found], j[found]
+        drop = coo_matrix((ones(len(i), bool), (i, j)), shape=matrix.shape)
+
+        matrix = matrix - matrix.multiply(drop.tocsr())
+        self.replace(self.from_matrix(matrix, nodes, self.compact))
+
+    def replace(self, other):
+        """None: Replace links and cached matrix with those of another graph."""
+        if other.compact:
+            self.arrays = other.arrays
+        else:
+            self.links = other.links
+            self.cache["matrix"] = other.matrix
+
     # Exporters
 
     def pairs(self):
         """Generate 2-tuples: (source, target) pairs without weights."""
         return ((s, t) for s, t, w in self)
 
+    def save(self, path, layout=None):
+        """
+        None: Write graph and optional layout to a folder of NumPy arrays.
+        Load with GraphFrame.load() and loadlayout().
+
+        Folder contents:
+            graph.json      {"format", "version", "nodes", "links", "layout"}
+            indptr.npy      int array: CSR row offsets (len(nodes) + 1)
+            indices.npy     int array: target node number of each link
+            weights.npy     number array: weight of each link
+            nodes.npy       number or str array: sorted node labels
+            layout.npy      float64 array: optional [x, y] rows for each node
+
+        Inputs:
+            path    str or Path: folder to create or overwrite
+            layout  DataFrame: ['x', 'y'] coordinates for each node
+        """
+        nodes = self.nodes
+        if self.compact:
+            indptr, indices, weights, _ = self.arrays
+        else:
+            matrix = self.matrix
+            indptr, indices, weights = matrix.indptr, matrix.indices, matrix.data
+
+        labels = Index(nodes).to_numpy()
+        if labels.dtype.kind == "O":
+            labels = labels.astype(str)
+            if labels.tolist() != nodes:
+                raise ValueError("node labels must be numbers or strings")
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        saved(path / "indptr.npy", indptr)
+        saved(path / "indices.npy", indices)
+        saved(path / "weights.npy", weights)
+        saved(path / "nodes.npy", labels)
+        if layout is None:
+            (path / "layout.npy").unlink(missing_ok=True)
+        else:
+            layout = DataFrame(layout).reindex(nodes)[["x", "y"]]
+            saved(path / "layout.npy", layout.to_numpy("float64"))
+
+        meta = {
+            "format": FORMAT,
+            "version": 1,
+            "nodes": len(nodes),
+            "links": len(indices),
+            "layout": layout is not None,
+        }
+        (path / "graph.json").write_text(dumps(meta, indent=2))
+
     def sources(self):
         """Generate (node, list[nodes]) tuples: Nodes pointing to each node."""
         return self.flipped.targets()
 
     def targets(self):
         """Generate (node, list[nodes]) tuples: Nodes to which each node points."""
-        for k, v in self.links.groupby("source", observed=True)["target"]:
-            yield k, sorted(v)
+        matrix = self.matrix
+        nodes = Index(self.nodes)
+
+        indptr, indices = matrix.indptr, matrix.indices
+        for i in flatnonzero(diff(indptr)):
+            yield nodes[i], nodes[indices[indptr[i] : indptr[i + 1]]].tolist()
+
+    # Layout methods
+
+    def multilevel(
+        self,
+        nsteps=128,
+        tol=0.01,
+        minsize=64,
+        engine="auto",
+        theta=0.5,
+        seed=None,
+        callback=None,
+    ):
+        """
+        DataFrame: Calculate ['x', 'y'] coordinates with a multilevel layout.
+        Merge matched pairs of linked nodes until the graph has <= minsize nodes,
+        lay out the smallest graph from random positions, then copy positions
+        to each larger graph and refine them at low speed.
+        Refinement speeds are relative to the layout radius, and each refinement
+        runs at least MINSTEPS steps, so merged nodes have time to separate.
+        Number of steps used at each level is saved in .attrs['nsteps'].
+
+        Inputs:
+            nsteps      int: maximum number of layout steps per level
+            tol         float: stop each level when mean step < tol * layout radius
+            minsize     int: stop merging nodes at this many nodes
+            engine      str or callable: repulsion engine (see repulsion)
+            theta       float: Barnes-Hut accuracy parameter (0 is exact)
+            seed        int: seed for a numpy.random.Generator (default: global RNG)
+            callback    callable: called with timings after each step (see probe)
+
+        Callback values include the level, from 0 for the smallest graph.
+        """
+        nodes = self.nodes
+        rng = random if (seed is None) else default_rng(seed)
+
+        matrices, groups = [self.matrix], []
+        while matrices[-1].shape[0] > minsize:
+            group = matched(matrices[-1], rng=rng)
+            n, k = len(group), group.max() + 1
+            if k > 0.9 * n:
+                break
+            merge = coo_matrix((ones(n), (arange(n), group)), shape=(n, k)).tocsr()
+            matrices.append((merge.T @ matrices[-1] @ merge).tocsr())
+            groups.append(group)
+
+        used = list()
+        points, speeds, minsteps = None, linspace(1, 0.1, nsteps - 1), 0
+        for matrix, group in zip(matrices[::-1], [None, *groups[::-1]]):
+            springs = springmatrix(matrix)
+            repulse = repulsion(engine, matrix.shape[0], theta)
+            if points is None:
+                points = randomz(matrix.shape[0], rng)
+            else:
+                points = points[group]
+                jitter = 1e-3 * abs(points - points.mean()).max()
+                points += jitter * randomz(len(group), rng)
+                points *= balanced(springs.dot(points), repulse(points))
+                radius = abs(points - points.mean()).max()
+                speeds = radius * linspace(0.05, 0.005, nsteps - 1)
+                minsteps = min(MINSTEPS, nsteps - 1)
+
+            report = None if (callback is None) else partial(callback, level=len(used))
+            points, nused = relaxed(
+                springs, points, speeds, repulse, tol, report, minsteps
+            )
+            used.append(nused)
+
+        return unitframe(points, nodes, nsteps=used)
 
     # Plotting methods
 
@@ -0,0 +1,88 @@
+"""
+Import time benchmark for the modules in this folder.
+Each module is imported in a fresh Python process with -X importtime.
+Exit status is 1 if any module is slower than its budget
+or imports a heavy package which it should only import when needed.
+
+Examples:
+    python importtime.py
+    python importtime.py --scale 2 tools plot
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+from subprocess import run
+from sys import executable
+
+FOLDER = Path(__file__).resolve().parent
+
+# Seconds to import each module, including pandas, NumPy, and SciPy
+BUDGETS = {
+    "classify": 0.5,
+    "cluster": 0.8,
+    "graph": 0.6,
+    "plot": 0.5,
+    "probe": 0.5,
+    "sample": 0.5,
+    "tools": 0.5,
+}
+
+# Packages which should be imported only by functions which need them
+LAZY = ("matplotlib", "sklearn")
+
+
+def importlog(module):
+    """dict: Cumulative seconds to import each package imported by module."""
+    proc = run(
+        [executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        cwd=FOLDER,
+        text=True,
+    )
+
+    seconds = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                seconds[name.strip()] = int(total) / 1e6
+
+    return seconds
+
+
+def importtime(module, nrepeat=5):
+    """(float, list): Fastest import time and lazy packages imported by module."""
+    logs = [importlog(module) for _ in range(nrepeat)]
+    seconds = min(log[module] for log in logs)
+    heavy = sorted({x.split(".")[0] for x in logs[0]}.intersection(LAZY))
+
+    return seconds, heavy
+
+
+def main(modules=(), nrepeat=5, scale=1.0):
+    """int: Print import times. Return 1 if any module is over budget."""
+    modules = list(modules) or list(BUDGETS)
+
+    failed = False
+    print(f"{'module':<10} {'seconds':>8} {'budget':>8}  lazy packages imported")
+    for module in modules:
+        seconds, heavy = importtime(module, nrepeat)
+        budget = scale * BUDGETS.get(module, 1.0)
+        over = (seconds > budget) or bool(heavy)
+        failed |= over
+
+        flag = "FAIL" if over else ""
+        print(f"{module:<10} {seconds:8.3f} {budget:8.3f}  {' '.join(heavy)} {flag}")
+
+    return int(failed)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Check import times against budgets.")
+    parser.add_argument("modules", nargs="*", help="modules to check (default all)")
+    parser.add_argument("--nrepeat", type=int, default=5, help="imports per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="budget multiplier")
+    args = parser.parse_args()
+
+    raise SystemExit(main(args.modules, args.nrepeat, args.scale))
@@ -1,5 +1,188 @@
-import matplotlib.pyplot
-import matplotlib.style
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from numpy import absolute, add, arange, asarray, ceil, cumsum, diff, errstate
+from numpy import flatnonzero, floor, inf, isnan, maximum, minimum, nan
+from numpy import nanmean, r_, repeat, sqrt, unique, where
+from pandas import DataFrame
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+from tools import Bands, periodcounts
+
+
+def blocked(data, budget):
+    """
+    DataFrame: Mean of each block of rows and columns, with at most budget cells.
+    Blocks are labeled by their first row and column. NaNs are ignored.
+    """
+    nrows, ncols = data.shape
+    if nrows * ncols <= budget:
+        return data
+
+    scale = sqrt(budget / (nrows * ncols))
+    maxcols = min(ncols, max(1, round(ncols * scale)))
+    maxrows = max(1, budget // maxcols)
+    rows = arange(0, nrows, int(ceil(nrows / maxrows)))
+    cols = arange(0, ncols, int(ceil(ncols / maxcols)))
+
+    values = data.to_numpy("float64")
+    missing = isnan(values)
+    sums = add.reduceat(add.reduceat(where(missing, 0, values), rows), cols, axis=1)
+    counts = add.reduceat(add.reduceat(~missing * 1, rows), cols, axis=1)
+    with errstate(invalid="ignore"):
+        means = sums / counts
+
+    return DataFrame(means, index=data.index[rows], columns=data.columns[cols])
+
+
+def downsampled(data, budget=None, how="minmax"):
+    """DataFrame or Series: Rows selected by minmax() or lttb() for line plots."""
+    if budget is None:
+        return data
+    if how not in ("lttb", "minmax"):
+        raise ValueError(f"unknown downsampling method: {how}")
+
+    return lttb(data, budget) if (how == "lttb") else minmax(data, budget)
+
+
+def headless():
+    """None: Use the non-interactive Agg backend in this process."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def lttb(data, budget):
+    """
+    DataFrame or Series: Rows selected by Largest-Triangle-Three-Buckets.
+    Each column keeps about budget points which preserve its visual shape.
+    Rows kept for any column are kept for all columns.
+    """
+    nrows = len(data)
+    if (nrows <= budget) or (budget < 3):
+        return data
+
+    x = xvalues(data.index)
+    edges = 1 + arange(budget - 1) * (nrows - 2) // (budget - 2)
+    sizes = diff(edges)
+    nextx = r_[(add.reduceat(x[:-1], edges[:-1]) / sizes)[1:], x[-1]]
+
+    keep = [0, nrows - 1]
+    for y in data.to_numpy("float64").reshape(nrows, -1).T:
+        y = where(isnan(y), nanmean(y) if (~isnan(y)).any() else 0, y)
+        nexty = r_[(add.reduceat(y[:-1], edges[:-1]) / sizes)[1:], y[-1]]
+
+        prev = 0
+        for i, (a, b) in enumerate(zip(edges[:-1], edges[1:])):
+            dx, dy = x[prev] - nextx[i], nexty[i] - y[prev]
+            area = absolute(dx * (y[a:b] - y[prev]) - (x[prev] - x[a:b]) * dy)
+            prev = a + area.argmax()
+            keep.append(prev)
+
+    return data.iloc[unique(keep)]
+
+
+def minmax(data, budget):
+    """
+    DataFrame or Series: Rows with the min and max of each column
+    in each of budget // 2 bins of consecutive rows, plus first and last rows.
+    Line plots look the same as with all rows, because each bin's vertical
+    extent is preserved. Rows kept for any column are kept for all columns.
+    """
+    nrows = len(data)
+    if nrows <= budget:
+        return data
+
+    bins = arange(nrows) * max(1, budget // 2) // nrows
+    starts = r_[0, flatnonzero(diff(bins)) + 1]
+    sizes = diff(r_[starts, nrows])
+
+    def firsts(hits):
+        """numpy int array: First hit position in each bin."""
+        hits = flatnonzero(hits)
+        return hits[r_[0, flatnonzero(diff(bins[hits])) + 1]]
+
+    keep = [r_[0, nrows - 1]]
+    for y in data.to_numpy("float64").reshape(nrows, -1).T:
+        low, high = where(isnan(y), inf, y), where(isnan(y), -inf, y)
+        keep.append(firsts(low == repeat(minimum.reduceat(low, starts), sizes)))
+        keep.append(firsts(high == repeat(maximum.reduceat(high, starts), sizes)))
+
+    return data.iloc[unique(r_[tuple(keep)])]
+
+
+def quantiles(ts, freq, q):
+    """
+    DataFrame: Same as ts.resample(freq).quantile(q).unstack(),
+    with periods from tools.periodcounts() and all quantiles found at once.
+    Each period's values are sorted in place, then every quantile
+    is interpolated between ranks at once. NaNs are ignored.
+    """
+    ts = ts.dropna()
+    if not ts.index.is_monotonic_increasing:
+        ts = ts.sort_index(kind="stable")
+
+    counts = periodcounts(ts, freq)
+    sizes = counts.to_numpy()
+    starts = cumsum(sizes) - sizes
+    values = ts.to_numpy("float64", copy=True)
+    for start, stop in zip(starts, starts + sizes):
+        values[start:stop].sort()
+
+    q = asarray(q, dtype="float64")
+    ranks = starts[:, None] + q * (sizes - 1).clip(0, None)[:, None]
+    lo = floor(ranks).astype("int64").clip(0, max(0, len(values) - 1))
+    hi = ceil(ranks).astype("int64").clip(0, max(0, len(values) - 1))
+    if len(values):
+        quants = values[lo] + (values[hi] - values[lo]) * (ranks - floor(ranks))
+        quants[sizes == 0] = nan
+    else:
+        quants = ranks * nan
+
+    return DataFrame(quants, index=counts.index, columns=q)
+
+
+def render(job):
+    """dict: Draw one chart for Plotter.render() and save it to a file."""
+    plotter, method, data, kwargs, path = job
+
+    start = perf_counter()
+    ax = getattr(plotter, method)(data, **kwargs)
+    drawn = perf_counter() - start
+    ax.figure.savefig(path)
+    saved = perf_counter() - start - drawn
+    plotter.close(ax.figure)
+
+    return {
+        "path": str(path),
+        "method": method,
+        "rows": len(data),
+        "draw_seconds": drawn,
+        "save_seconds": saved,
+        "seconds": drawn + saved,
+    }
+
+
+def xvalues(index):
+    """numpy float array: x-coordinates of index for lttb()."""
+    if is_numeric_dtype(index):
+        x = index.to_numpy("float64")
+    elif is_datetime64_any_dtype(index):
+        x = index.to_numpy("datetime64[ns]").astype("int64").astype("float64")
+    else:
+        return arange(len(index), dtype="float64")
+
+    return x - x[0]
+
+
+class StyleNames:
+    """Names of available matplotlib styles. Imports matplotlib when read."""
+
+    def __get__(self, obj, objtype=None):
+        from matplotlib.style import available
+
+        return available
 
 
 class Plotter:
@@ -11,11 +194,17 @@ class Plotter:
     This (and most other methods) returns an AxesSubplot.
 
     Modify .style to change the global matplotlib style setting.
+    The style is applied when the next figure is created, so matplotlib
+    is not imported until something is plotted.
+
+    If headless, then figures are matplotlib Figure objects with Agg canvases
+    instead of pyplot figures. They are never shown and pyplot does not
+    keep track of them. Use .close() or .render() to free their memory.
     """
 
-    styles = matplotlib.style.available
+    styles = StyleNames()
 
-    def __init__(self, style="bmh"):
+    def __init__(self, style="bmh", headless=False):
         params = {
             "axes": {
                 "frame_on": False,
@@ -42,6 +231,7 @@ class Plotter:
             },
         }
 
+        self.headless = headless
         self.params = params
         self.style = style
 
@@ -71,10 +261,9 @@ class Plotter:
 
     @style.setter
     def style(self, name):
-        """None: Modify matplotlib.style."""
-        matplotlib.style.use(name)
-
+        """None: Select matplotlib style for the next figure."""
         self._style = name
+        self.styled = False
 
     # Blank matplotlib objects
 
@@ -82,19 +271,88 @@ class Plotter:
         """AxesSubplot: Create blank axes."""
         return self.figure().add_subplot(**(self.params["axes"] | kwargs))
 
+    def close(self, figure):
+        """None: Close a figure created by this Plotter and free its memory."""
+        if self.headless:
+            figure.clear()
+        else:
+            from matplotlib import pyplot
+
+            pyplot.close(figure)
+
     def figure(self, **kwargs):
-        """Figure: Create a new figure."""
-        return matplotlib.pyplot.figure(**(self.params["figure"] | kwargs))
+        """Figure: Create a new figure. Modify matplotlib.style if necessary."""
+        from matplotlib import pyplot, style
+
+        if not self.styled:
+            style.use(self.style)
+            self.styled = True
+
+        kwargs = self.params["figure"] | kwargs
+        if self.headless:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            kwargs.pop("clear", None)
+            figure = Figure(**kwargs)
+            FigureCanvasAgg(figure)
+            return figure
+
+        return pyplot.figure(**kwargs)
+
+    # Batch rendering
+
+    def render(self, jobs, folder=".", fmt="png", n_jobs=None):
+        """
+        DataFrame: Draw many charts and save each one to a file.
+        Charts are drawn headless in a process pool with the Agg backend,
+        and each figure is closed as soon as it is saved.
+        Returns seconds to draw and save each chart, in the same order as jobs.
+
+        Inputs:
+            jobs    iterable of tuples: (method, data, kwargs) or
+                    (method, data, kwargs, filename) for each chart
+            folder  str or Path: folder to save files in
+            fmt     str: 'png' or 'svg' for files without a filename suffix
+            n_jobs  int or None: number of processes (1 to run in this process)
+
+        Example jobs:
+            [("line", data), ("hist", data, {"bins": 50}, "hist.svg")]
+        """
+        plotter = type(self)(self.style, headless=True)
+        plotter.params = self.params
+
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        tasks = []
+        for i, job in enumerate(jobs):
+            method, data, kwargs, name = tuple(job) + ({}, None)[len(job) - 2 :]
+            path = folder / (name or f"{i:04d}_{method}")
+            path = path if path.suffix else path.with_suffix(f".{fmt}")
+            tasks.append((plotter, method, data, kwargs, path))
+
+        if n_jobs == 1:
+            stats = list(map(render, tasks))
+        else:
+            with ProcessPoolExecutor(n_jobs, initializer=headless) as pool:
+                stats = list(pool.map(render, tasks))
+
+        return DataFrame(stats)
 
     # Plot methods with DataFrame input
 
-    def area(self, data, **kwargs):
-        """AxesSubplot: Area plot for each column."""
+    def area(self, data, budget=None, how="minmax", **kwargs):
+        """
+        AxesSubplot: Area plot for each column.
+        If budget, then draw at most about budget points per column.
+        See line() for downsampling options.
+        """
         kwargs = {
             "legend": True,
         } | kwargs
 
-        return self(data, kind="area", **kwargs)
+        return self(downsampled(data, budget, how), kind="area", **kwargs)
 
     def bar(self, data, **kwargs):
         """AxesSubplot: Bar plot for each column."""
@@ -143,8 +401,12 @@ class Plotter:
 
         return self(data, kind="density", **kwargs)
 
-    def heat(self, data, **kwargs):
-        """AxesSubplot: Heatmap with same rows and columns as input."""
+    def heat(self, data, budget=None, **kwargs):
+        """
+        AxesSubplot: Heatmap with same rows and columns as input.
+        If budget, then blocks of rows and columns are averaged
+        until there are at most budget cells. See blocked().
+        """
         axes = self.axes
 
         kwargs = {
@@ -158,6 +420,9 @@ class Plotter:
             "ylabel": None,
         } | kwargs
 
+        if budget is not None:
+            data = blocked(data, budget)
+
         data = data.iloc[::-1, :]
         cols = data.columns
         rows = data.index
@@ -188,22 +453,49 @@ class Plotter:
 
         return self(data, kind="hist", **kwargs)
 
-    def line(self, data, **kwargs):
-        """AxesSubplot: Line plot for each column."""
+    def line(self, data, budget=None, how="minmax", **kwargs):
+        """
+        AxesSubplot: Line plot for each column.
+        If budget, then draw at most about budget points per column.
+
+        Downsampling methods:
+            minmax  keep min and max of each bin: exact envelope, fastest
+            lttb    Largest-Triangle-Three-Buckets: smoother, for few columns
+        """
         kwargs = {
             "grid": True,
             "legend": True,
         } | kwargs
 
-        return self(data, kind="line", **kwargs)
+        return self(downsampled(data, budget, how), kind="line", **kwargs)
 
-    def scatter(self, data, **kwargs):
+    def scatter(self, data, budget=None, **kwargs):
         """
         AxesSubplot: Scatterplot with first 2 columns as (x,y) pairs.
         If 3rd column exists, then its values are point colors.
         If 4th column exists, then its values are point sizes.
+
+        If budget and there are more than budget rows, then draw a hexbin
+        density plot with about budget hexagons instead. If 3rd column exists,
+        then hexagon colors are its mean values. Otherwise, they are counts.
         """
         cols = data.columns
+        if (budget is not None) and (len(data) > budget):
+            kwargs = {
+                "cmap": "inferno",
+                "colorbar": True,
+                "grid": True,
+                "gridsize": max(1, round((budget / 1.15) ** 0.5)),
+                "legend": False,
+                "mincnt": 1,
+                "x": cols[0],
+                "y": cols[1],
+            } | kwargs
+            if len(cols) > 2:
+                kwargs = {"C": cols[2]} | kwargs
+
+            return self(data, kind="hexbin", **kwargs)
+
         kwargs = {
             "alpha": 0.707,
             "colorbar": False,
@@ -226,7 +518,12 @@ class Plotter:
     def quant(self, ts, freq, q=(), **kwargs):
         """
         AxesSubplot: Contour plot of quantiles per period.
-        Input must be a Series with a datetime-like index.
+        Input must be a Series with a datetime-like index,
+        an iterable of such Series, or a tools.Bands object.
+
+        Quantiles of a Series are exact. Quantiles of chunks or Bands
+        are approximate, and chunks are read one at a time.
+        Use tools.Bands to combine chunks from many files or processes.
         """
         kwargs = {
             "color": list("krygbck"),
@@ -236,7 +533,12 @@ class Plotter:
         } | kwargs
 
         q = list(q) or [0, 0.05, 0.25, 0.50, 0.75, 0.95, 1]
-        data = ts.resample(freq).quantile(q).unstack()
+        if hasattr(ts, "resample"):
+            data = quantiles(ts, freq, q)
+        elif isinstance(ts, Bands):
+            data = ts.quantiles(q)
+        else:
+            data = Bands(freq).update(*ts).quantiles(q)
         data.columns = [f"{int(100 * x)} percentile" for x in data.columns]
 
         return self(data, kind="line", **kwargs)
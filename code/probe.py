@@ -0,0 +1,110 @@
+"""
+Record timings and other values from instrumented loops.
+Functions and classes which accept a callback call it as
+callback(stage, seconds, **values) after each stage or step.
+Any function with that signature can be a callback. A Probe stores them all.
+"""
+
+from contextlib import contextmanager
+from time import perf_counter
+from tracemalloc import get_traced_memory, is_tracing, reset_peak, start, stop
+
+from pandas import DataFrame
+
+
+class Probe:
+    """
+    Callback which stores one record per call, e.g. one per layout step.
+    Use as a context manager to time a whole run and trace peak memory.
+    Callbacks cost nothing unless given, so probes can stay in production code.
+
+    Constructor inputs:
+        memory  bool: trace peak memory with tracemalloc? (slows down Python)
+
+    Call inputs:
+        stage   str: name of the stage which just finished
+        seconds float: time spent in that stage
+        values  are stored as extra columns, e.g. step, energy, displacement
+
+    Example:
+        with Probe(memory=True) as probe:
+            graph(nsteps=64, callback=probe)
+        probe.summary
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = list()
+        self.started = None
+        self.tracing = False
+
+    def __call__(self, stage, seconds, **values):
+        record = {"stage": stage, "seconds": seconds, **values}
+        if self.memory and is_tracing():
+            record["peak"] = get_traced_memory()[1]
+
+        self.records.append(record)
+
+    def __enter__(self):
+        if self.memory:
+            self.tracing = not is_tracing()
+            if self.tracing:
+                start()
+            reset_peak()
+
+        self.started = perf_counter()
+
+        return self
+
+    def __exit__(self, *exc):
+        self("total", perf_counter() - self.started)
+        if self.tracing:
+            stop()
+            self.tracing = False
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        return f"{type(self).__name__} with {len(self)} records"
+
+    @property
+    def frame(self):
+        """DataFrame: One row per record with columns for all recorded values."""
+        return DataFrame.from_records(self.records)
+
+    @property
+    def steps(self):
+        """DataFrame: Layout step records, e.g. to plot energy and displacement."""
+        frame = self.frame
+        if "step" not in frame:
+            return frame.iloc[:0]
+
+        return frame.loc[frame["stage"].eq("step")].dropna(axis=1, how="all")
+
+    @property
+    def summary(self):
+        """DataFrame: Count, total, and mean seconds for each stage."""
+        frame = self.frame
+        if frame.empty:
+            return DataFrame(columns=["count", "sum", "mean"])
+
+        summary = frame.groupby("stage", sort=False)["seconds"]
+        summary = summary.agg(["count", "sum", "mean"])
+        if "peak" in frame:
+            summary["peak"] = frame.groupby("stage", sort=False)["peak"].max()
+
+        return summary.sort_values("sum", ascending=False)
+
+    def clear(self):
+        """None: Forget all records."""
+        self.records.clear()
+
+    @contextmanager
+    def stage(self, name, **values):
+        """context manager: Record seconds spent inside a with block as a stage."""
+        began = perf_counter()
+        try:
+            yield self
+        finally:
+            self(name, perf_counter() - began, **values)
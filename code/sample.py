@@ -0,0 +1,121 @@
+"""
+Random samples of rows from DataFrames, chunks, and CSV files.
+Every function takes a seed for numpy.random.default_rng().
+"""
+
+from pathlib import Path
+
+from numpy import arange, argpartition, bincount, concatenate, cumsum, lexsort
+from numpy import empty, minimum, repeat, rint
+from numpy.random import default_rng
+from pandas import Categorical, concat, read_csv
+
+from tools import DATADIR
+
+
+def csvsample(path, n=5, seed=None, chunksize=100_000, **kwargs):
+    """
+    DataFrame: Distinct random rows from a CSV file, read in one pass.
+    Only one chunk and n sampled rows are in memory at a time.
+
+    Inputs:
+        path        str or Path: file path, relative to DATADIR if not absolute
+        n           int: number of rows to sample
+        seed        int or None: random seed
+        chunksize   int: number of rows to read at a time
+        kwargs      are passed to pandas.read_csv()
+    """
+    path = Path(DATADIR, path)
+    chunks = read_csv(path, chunksize=chunksize, **kwargs)
+
+    return reservoir(chunks, n, seed)
+
+
+def positions(nrows, n, seed=None, sort=False):
+    """
+    numpy int array: Distinct random positions in range(nrows).
+    Takes O(n) time and memory if n is much less than nrows,
+    so no permutation of all nrows positions is created.
+    """
+    picks = default_rng(seed).choice(nrows, size=n, replace=False, shuffle=not sort)
+    if sort:
+        picks.sort()
+
+    return picks
+
+
+def reservoir(chunks, n=5, seed=None):
+    """
+    DataFrame: Distinct random rows from an iterable of DataFrames.
+    Each row gets a random key and the n rows with smallest keys are kept,
+    so every row is equally likely to be sampled. Rows are in stream order.
+    Only one chunk and n sampled rows are in memory at a time.
+    """
+    rng = default_rng(seed)
+
+    kept, nrows = None, 0
+    keys, stamps = empty(0), empty(0, dtype="int64")
+    for chunk in chunks:
+        chunkkeys = rng.random(len(chunk))
+        chunkstamps = arange(nrows, nrows + len(chunk))
+        nrows += len(chunk)
+
+        if n and (len(keys) == n):
+            new = chunkkeys < keys.max()
+            chunk = chunk.iloc[new.nonzero()[0]]
+            chunkkeys, chunkstamps = chunkkeys[new], chunkstamps[new]
+
+        kept = chunk if kept is None else concat([kept, chunk])
+        keys = concatenate([keys, chunkkeys])
+        stamps = concatenate([stamps, chunkstamps])
+        if len(keys) > n:
+            best = argpartition(keys, n - 1)[:n] if n else arange(0)
+            best.sort()
+            kept, keys, stamps = kept.iloc[best], keys[best], stamps[best]
+
+    if kept is None:
+        raise ValueError("no chunks to sample")
+
+    return kept.iloc[stamps.argsort(kind="stable")].copy()
+
+
+def rows(data, n=5, seed=None, sort=False):
+    """
+    DataFrame: Distinct random rows from a DataFrame.
+    Rows are selected by position, so duplicate index labels are allowed.
+    If sort, then rows are in the same order as data.
+    """
+    return data.iloc[positions(len(data), n, seed, sort)].copy()
+
+
+def stratified(data, column, n=None, frac=None, seed=None, sort=False):
+    """
+    DataFrame: Distinct random rows from each group of a categorical column.
+    Takes min(n, group size) rows or round(frac * group size) rows per group.
+    Rows with missing values in column are never sampled.
+
+    Inputs:
+        data    DataFrame: rows to sample
+        column  str: name of column to group by
+        n       int: maximum rows per group
+        frac    float: fraction of each group to sample, if n is None
+        seed    int or None: random seed
+        sort    bool: keep rows in the same order as data?
+    """
+    if (n is None) == (frac is None):
+        raise ValueError("use exactly one of n or frac")
+
+    codes = Categorical(data[column]).codes
+    sizes = bincount(codes[codes >= 0])
+    quotas = minimum(n, sizes) if frac is None else rint(frac * sizes).astype(int)
+
+    # Shuffle within groups, then keep the first quota rows of each group
+    order = lexsort((default_rng(seed).random(len(codes)), codes))
+    order = order[codes[order] >= 0]
+    starts = repeat(cumsum(sizes) - sizes, sizes)
+    ranks = arange(len(order)) - starts
+    picks = order[ranks < quotas[codes[order]]]
+    if sort:
+        picks.sort()
+
+    return data.iloc[picks].copy()
@@ -1,25 +1,88 @@
 """
-Constants and convenience functions.
+Constants, convenience functions, and fitted transforms.
 """
-from pathlib import Path
 
-from numpy import cov, random
-from numpy.linalg import eigh
-from pandas import Categorical, DataFrame, Series, read_csv, to_datetime
-from sklearn.datasets import load_iris
+from hashlib import sha256
+from json import dumps, loads
+from pathlib import Path
+from warnings import warn
 
+from numpy import absolute, asarray, bincount, concatenate, cov, cumsum, empty
+from numpy import floor, interp, isnan, load as loadnpy, nansum, ones, outer
+from numpy import dtype as npdtype, inf, nan, save as savenpy, sqrt, zeros
+from numpy.linalg import eigh, qr, svd
+from numpy.random import default_rng
+from pandas import Categorical, CategoricalDtype, DataFrame, DatetimeTZDtype
+from pandas import RangeIndex, Series, read_csv, to_datetime
+from pandas.api.types import is_string_dtype
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Day, Tick
 
 REPO = Path(__file__).resolve().parent.parent
 DATADIR = REPO / "data"
+FORMAT = "Table"
+
+
+def afew(data, n=5, seed=None):
+    """
+    DataFrame: Distinct random rows from a DataFrame.
+    Rows are selected by position, so duplicate index labels are allowed.
+    See sample.py for more ways to sample rows.
+    """
+    picks = default_rng(seed).choice(len(data), size=n, replace=False)
+
+    return data.iloc[picks].copy()
+
+
+def cachecolumn(column, path):
+    """dict: Save one Series as a .npy file. Return metadata for readcache()."""
+    dtype = column.dtype
+    meta = {"name": column.name, "file": path.name}
 
+    if isinstance(dtype, CategoricalDtype):
+        meta["kind"] = "category"
+        meta["categories"] = dtype.categories.tolist()
+        meta["ordered"] = bool(dtype.ordered)
+        values = column.cat.codes.to_numpy()
+    elif isinstance(dtype, DatetimeTZDtype):
+        meta["kind"] = "datetimetz"
+        meta["tz"] = str(dtype.tz)
+        values = column.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+    elif is_string_dtype(dtype):
+        missing = column.isna().to_numpy()
+        if not column[~missing].map(type).eq(str).all():
+            raise TypeError(f"column {column.name} has non-string values")
+        meta["kind"] = "str"
+        meta["dtype"] = str(dtype)
+        meta["missing"] = bool(missing.any())
+        values = column.fillna("").to_numpy(dtype=str)
+        if meta["missing"]:
+            savenpy(path.with_suffix(".na.npy"), missing)
+    elif isinstance(dtype, npdtype) and (dtype.kind in "biufcmM"):
+        meta["kind"] = "array"
+        values = column.to_numpy()
+    else:
+        raise TypeError(f"column {column.name} has dtype {dtype}")
 
-def afew(data, n=5):
-    """DataFrame view: Distinct random rows from a DataFrame."""
-    return data.loc[random.choice(data.index, size=n, replace=False)].copy()
+    savenpy(path, values)
+
+    return meta
+
+
+def filehash(path, blocksize=2**20):
+    """str: SHA-256 hex digest of a file, read one block at a time."""
+    digest = sha256()
+    with open(path, "rb") as file:
+        while block := file.read(blocksize):
+            digest.update(block)
+
+    return digest.hexdigest()
 
 
 def irisdata():
     """DataFrame: Fisher's iris dataset from scikit-learn."""
+    from sklearn.datasets import load_iris
+
     raw = load_iris()
     cols = [x.rstrip("(cm)").strip().replace(" ", "_") for x in raw.feature_names]
     cats = Categorical.from_codes(raw.target, raw.target_names)
@@ -28,34 +91,583 @@ def irisdata():
     return data
 
 
-def princols(data, ncols=2):
+def load(name, columns=None, rows=None, refresh=False, **kwargs):
+    """
+    DataFrame: CSV file from DATADIR, parsed once and then read from a cache.
+    The cache is a folder of .npy column arrays next to the CSV file.
+    It is rebuilt if the CSV file or parsing options change,
+    and only the requested columns and rows are read from it.
+
+    Inputs:
+        name        str: path relative to DATADIR with or without '.csv'
+        columns     list: column names to read (index is always read)
+        rows        slice: row positions to read, e.g. slice(0, 1000)
+        refresh     bool: parse CSV again even if cache is up to date?
+        kwargs      are passed to pandas.read_csv(), e.g. dtype, parse_dates
+
+    Example:
+        load("clean/energy", index_col="year", columns=["coal", "gas"])
+    """
+    path = Path(DATADIR, name)
+    if path.suffix != ".csv":
+        path = path.with_name(path.name + ".csv")
+    folder = path.with_suffix(".cache")
+    options = dumps(kwargs, sort_keys=True, default=str)
+    stat = path.stat()
+
+    meta = None
+    if not refresh and (folder / "table.json").exists():
+        meta = loads((folder / "table.json").read_text())
+        if (meta.get("format"), meta["options"]) != (FORMAT, options):
+            meta = None
+        elif meta["size"] != stat.st_size:
+            meta = None
+        elif meta["mtime_ns"] != stat.st_mtime_ns:
+            if meta["sha256"] != filehash(path):
+                meta = None
+            else:
+                meta["mtime_ns"] = stat.st_mtime_ns
+                (folder / "table.json").write_text(dumps(meta, indent=2))
+
+    if meta is None:
+        data = read_csv(path, **kwargs)
+        try:
+            meta = writecache(data, folder, path, options)
+        except TypeError as error:
+            warn(f"Not caching {path.name}: {error}")
+            data = data if columns is None else data[list(columns)]
+            return data if rows is None else data.iloc[rows]
+
+    return readcache(folder, meta, columns, rows)
+
+
+def periodcounts(ts, freq):
+    """
+    Series: Number of values in each period of a Series sorted by time.
+    Fixed-length periods, e.g. 'min', 'h', 'D', or '7D', are counted from
+    1970-01-01, so chunks which start at different times share the same periods.
+    Days are calendar days in the local time of a timezone-aware index.
+    Calendar periods, e.g. 'W' or 'ME', do not depend on where data starts.
+    """
+    offset = to_offset(freq)
+    if isinstance(offset, Day):  # pandas ignores origin for days
+        tz = ts.index.tz
+        if tz is not None:
+            counts = periodcounts(ts.tz_localize(None), offset)
+            counts.index = counts.index.tz_localize(tz, nonexistent="shift_forward")
+            return counts
+        offset = to_offset(f"{24 * offset.n}h")
+
+    if isinstance(offset, Tick):
+        return ts.resample(offset, origin="epoch").count()
+
+    return ts.resample(offset).count()
+
+
+def princols(data, ncols=2, solver="exact", seed=0):
     """
     DataFrame: DataFrame with numerical columns replaced by principal components.
 
     Inputs:
         data    DataFrame   features are columns and rows are observations
         ncols   int > 0     output will have this many columns
+        solver  str         'exact', 'randomized', or 'auto'
+        seed    int         random seed for randomized solver
+
+    The randomized solver is faster for many features but approximate.
+    Use Projection to project new data onto the same components.
+    """
+    return Projection(data, ncols, solver, seed)(data)
+
+
+def randeigh(matrix, ncols, seed=0, niter=None, extra=10):
+    """
+    (numpy array, numpy array): Largest eigenvalues and eigenvectors
+    of a symmetric positive semidefinite matrix, found by randomized
+    subspace iteration in O(d² * ncols) time instead of O(d³).
+    Results are approximate. More iterations are more accurate.
+    """
+    rng = default_rng(seed)
+    niter = randiters(ncols, len(matrix)) if (niter is None) else niter
+
+    basis = qr(matrix @ rng.standard_normal((len(matrix), ncols + extra)))[0]
+    for _ in range(niter):
+        basis = qr(matrix @ basis)[0]
+    eigvals, eigvecs = eigh(basis.T @ matrix @ basis)
+
+    return eigvals[::-1][:ncols], (basis @ eigvecs)[:, ::-1][:, :ncols]
+
+
+def randiters(ncols, nfeats):
+    """int: Default subspace iterations for randeigh() and randsvd(), as in sklearn."""
+    return 7 if (ncols < 0.1 * nfeats) else 4
+
+
+def randsvd(values, ncols, seed=0, niter=None, extra=10):
+    """
+    (numpy array, numpy array): Variances and principal axes of centered values,
+    found by randomized SVD without computing a covariance matrix.
+    Results are approximate. More iterations are more accurate.
     """
-    feats = data[data.select_dtypes("number").columns]
-    notfeats = data[data.columns.drop(feats.columns)]
+    rng = default_rng(seed)
+    niter = randiters(ncols, values.shape[1]) if (niter is None) else niter
 
-    # Find eigenvectors of covariance matrix with largest eigenvalues
-    eigvals, eigvecs = eigh(cov(feats, rowvar=False))
-    eigvecs = eigvecs[:, -1 : -(1 + ncols) : -1]
+    basis = qr(values @ rng.standard_normal((values.shape[1], ncols + extra)))[0]
+    for _ in range(niter):
+        basis = qr(values @ qr(values.T @ basis)[0])[0]
+    _, sings, axes = svd(basis.T @ values, full_matrices=False)
+    eigvals = sings[:ncols] ** 2 / (len(values) - 1)
 
-    # Transform features to new coordinates
-    pcols = DataFrame(feats @ eigvecs)
-    pcols.columns = [f"pc{n}" for n in range(ncols)]
+    return eigvals, axes[:ncols].T
 
-    return pcols.join(notfeats)
 
+def readcache(folder, meta, columns=None, rows=None):
+    """DataFrame: Selected columns and rows from a folder written by writecache()."""
+    rows = slice(None) if rows is None else rows
+    nindex = len(meta["index"])
+    infos = meta["columns"]
 
-def zscores(data, robust=False):
-    """DataFrame: Data with each numeric column standardized."""
-    data = DataFrame(data).copy()
+    names = [x["name"] for x in infos[nindex:]]
+    if columns is not None:
+        missing = [x for x in columns if x not in names]
+        if missing:
+            raise KeyError(f"columns not in {meta['source']}: {missing}")
+        infos = infos[:nindex] + [infos[nindex + names.index(x)] for x in columns]
 
-    for c in data.select_dtypes("number").columns:
-        data[c] -= data[c].median() if robust else data[c].mean()
-        data[c] /= data[c].abs().mean() if robust else data[c].std()
+    data = {}
+    for info in infos:
+        values = loadnpy(folder / info["file"], mmap_mode="r")[rows]
+        kind = info["kind"]
+        if kind == "category":
+            values = Categorical.from_codes(
+                values, info["categories"], ordered=info["ordered"]
+            )
+        elif kind == "datetimetz":
+            values = Series(values).dt.tz_localize("UTC").dt.tz_convert(info["tz"])
+            values = values.array
+        elif kind == "str":
+            values = values.astype(object)
+            if info["missing"]:
+                missing = loadnpy(folder / info["file"].replace(".npy", ".na.npy"))
+                values[missing[rows]] = nan
+            values = Series(values, dtype=info["dtype"]).array
+        else:
+            values = values.copy()
+        data[info["name"]] = values
+    data = DataFrame(data)
+
+    if nindex:
+        data = data.set_index([x["name"] for x in infos[:nindex]])
+        data.index.names = meta["index"]
+    else:
+        data.index = RangeIndex(meta["nrows"])[rows]
 
     return data
+
+
+def solverfor(solver, ncols, nfeats):
+    """str: 'exact' or 'randomized' eigenvector solver."""
+    if solver == "auto":
+        return "randomized" if (nfeats > 500) and (10 * ncols <= nfeats) else "exact"
+    if solver not in ("exact", "randomized"):
+        raise ValueError(f"unknown solver: {solver}")
+
+    return solver
+
+
+def zscores(data, robust=False, copy=True):
+    """
+    DataFrame: Data with each numeric column standardized.
+    If robust, then subtract medians and divide by mean absolute deviations.
+    Otherwise, subtract means and divide by standard deviations.
+    If not copy, then numeric columns of data are replaced in place.
+    """
+    if not isinstance(data, DataFrame):
+        data = DataFrame(data)
+
+    return Scaler(data, robust)(data, copy)
+
+
+def writecache(data, folder, path, options):
+    """
+    dict: Save a DataFrame as a folder of .npy column arrays for readcache().
+    Raise TypeError if any column cannot be saved without pickling.
+
+    Folder contents:
+        table.json      {"format", "version", "source", "size", "mtime_ns",
+                         "sha256", "options", "nrows", "index", "columns"}
+        colN.npy        array: values or category codes of Nth column
+        colN.na.npy     bool array: missing values of Nth column if it has str
+    """
+    index = list(data.index.names)
+    if (index == [None]) and data.index.equals(RangeIndex(len(data))):
+        index = []
+    else:
+        data = data.reset_index()
+    if not data.columns.is_unique:
+        raise TypeError("column names are not unique")
+
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "table.json").unlink(missing_ok=True)
+    columns = [
+        cachecolumn(data.iloc[:, i], folder / f"col{i}.npy")
+        for i in range(data.shape[1])
+    ]
+
+    stat = path.stat()
+    meta = {
+        "format": FORMAT,
+        "version": 1,
+        "source": path.name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": filehash(path),
+        "options": options,
+        "nrows": len(data),
+        "index": index,
+        "columns": columns,
+    }
+    (folder / "table.json").write_text(dumps(meta, indent=2))
+
+    return meta
+
+
+class Bands:
+    """
+    Approximate quantiles per period of a time series, built chunk by chunk.
+    Each period has a Sketch, so Bands can be merged across files or processes.
+    Periods are found by periodcounts(), so chunks which start at different
+    times share the same periods.
+
+    Constructor inputs:
+        freq    str: pandas frequency of periods, e.g. 'h' or 'D'
+        size    int > 0: size of each period's Sketch
+    """
+
+    def __init__(self, freq, size=1024):
+        self.freq = freq
+        self.size = size
+        self.sketches = {}
+
+    def __len__(self):
+        return len(self.sketches)
+
+    def __repr__(self):
+        return f"{type(self).__name__}('{self.freq}') with {len(self)} periods"
+
+    def merge(self, other):
+        """Bands: New Bands with values from both Bands."""
+        merged = type(self)(self.freq, max(self.size, other.size))
+        empty = Sketch(merged.size)
+        for period in set(self.sketches) | set(other.sketches):
+            mine = self.sketches.get(period, empty)
+            merged.sketches[period] = mine.merge(other.sketches.get(period, empty))
+
+        return merged
+
+    def quantiles(self, q):
+        """DataFrame: Approximate quantiles with one row per period."""
+        periods = sorted(self.sketches)
+        quants = [self.sketches[x].quantile(q) for x in periods]
+        quants = DataFrame(quants, index=periods, columns=q)
+        if len(quants):
+            allperiods = periodcounts(Series(0, index=quants.index), self.freq)
+            quants = quants.reindex(allperiods.index)
+
+        return quants
+
+    def update(self, *chunks):
+        """Bands: Add values from one or more Series with datetime-like index."""
+        for ts in chunks:
+            ts = ts.dropna()
+            if not ts.index.is_monotonic_increasing:
+                ts = ts.sort_index(kind="stable")
+
+            counts = periodcounts(ts, self.freq)
+            counts = counts[counts > 0]
+            values = ts.to_numpy("float64")
+            stops = cumsum(counts.to_numpy())
+            for period, stop, size in zip(counts.index, stops, counts):
+                sketch = self.sketches.setdefault(period, Sketch(self.size))
+                sketch.update(values[stop - size : stop])
+
+        return self
+
+
+class Projection:
+    """
+    Principal component projection fitted to numeric columns of a DataFrame.
+    Call with new data to replace numeric columns with principal components.
+    Features are not centered before projection, same as princols().
+
+    Constructor inputs:
+        data    DataFrame   features are columns and rows are observations
+        ncols   int > 0     number of principal components to keep
+        solver  str         'exact', 'randomized', or 'auto'
+        seed    int         random seed for randomized solver
+
+    The exact solver finds all eigenvectors of the covariance matrix.
+    The randomized solver finds only ncols of them, which is much faster
+    if ncols is small and there are many features, but approximate.
+    'exact' is the default. 'auto' uses randomized if there are more than
+    500 features and ncols is at most 1/10 of them.
+
+    Call inputs:
+        data    DataFrame   must include the same numeric columns
+    """
+
+    def __init__(self, data, ncols=2, solver="exact", seed=0):
+        feats = data.select_dtypes("number")
+        values = feats.to_numpy("float64")
+        means = values.mean(axis=0)
+
+        if solverfor(solver, ncols, len(feats.columns)) == "randomized":
+            eigvals, eigvecs = randsvd(values - means, ncols, seed)
+        else:
+            eigvals, eigvecs = eigh(cov(values, rowvar=False))
+            eigvals, eigvecs = eigvals[::-1][:ncols], eigvecs[:, ::-1][:, :ncols]
+
+        self.fitted(feats.columns, means, eigvals, eigvecs)
+
+    def __call__(self, data):
+        axes = self.axes
+
+        feats = data[axes.index]
+        notfeats = data[data.columns.drop(axes.index)]
+
+        pcols = DataFrame(feats.to_numpy("float64") @ axes.values, index=data.index)
+        pcols.columns = axes.columns
+
+        return pcols.join(notfeats)
+
+    def __repr__(self):
+        nrows, ncols = self.axes.shape
+        return f"{type(self).__name__} from {nrows} to {ncols} columns"
+
+    def fitted(self, features, means, eigvals, eigvecs):
+        """None: Save fitted components. Used by constructors."""
+        names = [f"pc{n}" for n in range(eigvecs.shape[1])]
+
+        self.axes = DataFrame(eigvecs, index=features, columns=names)
+        self.means = Series(means, index=features)
+        self.variances = Series(eigvals, index=names)
+
+    # Constructors
+
+    @classmethod
+    def from_chunks(cls, chunks, ncols=2, solver="exact", seed=0):
+        """
+        Projection: Fit to one DataFrame at a time.
+        Use for data which does not fit in memory,
+        e.g. pandas.read_csv(path, chunksize=100_000).
+        Covariance is accumulated in one pass with O(d²) memory.
+        """
+        features, nrows = None, 0
+        for chunk in chunks:
+            if features is None:
+                features = chunk.select_dtypes("number").columns
+                shift = chunk[features].to_numpy("float64").mean(axis=0)
+                sums = zeros(len(features))
+                squares = zeros((len(features), len(features)))
+
+            values = chunk[features].to_numpy("float64") - shift
+            nrows += len(values)
+            sums += values.sum(axis=0)
+            squares += values.T @ values
+
+        if features is None:
+            raise ValueError("no chunks to fit")
+
+        means = sums / nrows
+        covs = (squares - nrows * outer(means, means)) / (nrows - 1)
+        if solverfor(solver, ncols, len(features)) == "randomized":
+            eigvals, eigvecs = randeigh(covs, ncols, seed)
+        else:
+            eigvals, eigvecs = eigh(covs)
+            eigvals, eigvecs = eigvals[::-1][:ncols], eigvecs[:, ::-1][:, :ncols]
+
+        projection = cls.__new__(cls)
+        projection.fitted(features, means + shift, eigvals, eigvecs)
+
+        return projection
+
+
+class Scaler:
+    """
+    Standardizer fitted to numeric columns of a DataFrame.
+    Call with new data to standardize it with the same statistics.
+
+    Constructor inputs:
+        data    DataFrame   features are columns and rows are observations
+        robust  bool        use medians and mean absolute deviations?
+
+    Call inputs:
+        data    DataFrame   must include the same numeric columns
+        copy    bool        if False, replace numeric columns of data in place
+    """
+
+    def __init__(self, data, robust=False):
+        feats = data.select_dtypes("number")
+
+        if robust:
+            center = feats.median()
+            scale = (feats - center).abs().mean()
+        else:
+            center = feats.mean()
+            scale = feats.std()
+
+        self.center = center
+        self.robust = robust
+        self.scale = scale
+
+    def __call__(self, data, copy=True):
+        center = self.center
+        scale = self.scale
+
+        scaled = data[center.index].to_numpy("float64") - center.values
+        scaled /= scale.values
+        if copy:
+            data = data.copy(deep=False)
+        data[center.index] = scaled
+
+        return data
+
+    def __repr__(self):
+        return f"{type(self).__name__} for {len(self.center)} columns"
+
+    # Constructors
+
+    @classmethod
+    def from_chunks(cls, chunks, robust=False, size=1024):
+        """
+        Scaler: Fit to one DataFrame at a time in one pass.
+        Use for data which does not fit in memory,
+        e.g. pandas.read_csv(path, chunksize=100_000).
+        Means and standard deviations are exact, using Welford's method
+        to merge chunk statistics. Robust medians and mean absolute deviations
+        are approximated with a Sketch of the given size for each column.
+        """
+        features, sketches = None, []
+        for chunk in chunks:
+            if features is None:
+                features = chunk.select_dtypes("number").columns
+                counts, means, squares = zeros((3, len(features)))
+                sketches = [Sketch(size) for _ in features] if robust else []
+
+            values = chunk[features].to_numpy("float64")
+            for sketch, column in zip(sketches, values.T):
+                sketch.update(column)
+
+            n = (~isnan(values)).sum(axis=0)
+            total = (counts + n).clip(1, None)
+            chunkmeans = nansum(values, axis=0) / n.clip(1, None)
+            delta = chunkmeans - means
+            squares += nansum((values - chunkmeans) ** 2, axis=0)
+            squares += delta**2 * counts * n / total
+            means += delta * n / total
+            counts += n
+
+        if features is None:
+            raise ValueError("no chunks to fit")
+
+        if robust:
+            center = [x.quantile(0.5) for x in sketches]
+            scale = [x.meanabs(c) for x, c in zip(sketches, center)]
+        else:
+            center = means
+            scale = sqrt(squares / (counts - 1).clip(0, None))
+
+        scaler = cls.__new__(cls)
+        scaler.center = Series(center, index=features, dtype="float64")
+        scaler.robust = robust
+        scaler.scale = Series(scale, index=features, dtype="float64")
+
+        return scaler
+
+
+class Sketch:
+    """
+    Mergeable approximate quantiles of a stream of numbers.
+    Values are kept as weighted centroids. When there are more than
+    2 * size centroids, they are merged into size centroids of equal weight,
+    so quantile ranks are accurate to about 1 / size. NaNs are ignored.
+    Minimum and maximum values are exact.
+
+    Constructor inputs:
+        size    int > 0     number of centroids to keep after compression
+    """
+
+    def __init__(self, size=1024):
+        self.max = -inf
+        self.min = inf
+        self.size = size
+        self.values = empty(0)
+        self.weights = empty(0)
+
+    def __len__(self):
+        return int(self.weights.sum())
+
+    def __repr__(self):
+        return f"{type(self).__name__} of {len(self)} values"
+
+    def compress(self):
+        """Sketch: Merge centroids into at most self.size centroids."""
+        order = self.values.argsort(kind="stable")
+        values, weights = self.values[order], self.weights[order]
+
+        total = weights.sum()
+        bins = floor((cumsum(weights) - weights / 2) * (self.size / total))
+        bins = bins.astype("int64")
+        newweights = bincount(bins, weights)
+        keep = newweights > 0
+
+        self.values = bincount(bins, weights * values)[keep] / newweights[keep]
+        self.weights = newweights[keep]
+
+        return self
+
+    def merge(self, other):
+        """Sketch: New sketch with values from both sketches."""
+        merged = type(self)(max(self.size, other.size))
+        merged.max = max(self.max, other.max)
+        merged.min = min(self.min, other.min)
+        merged.values = concatenate([self.values, other.values])
+        merged.weights = concatenate([self.weights, other.weights])
+        if len(merged.values) > 2 * merged.size:
+            merged.compress()
+
+        return merged
+
+    def meanabs(self, center):
+        """float: Approximate mean absolute deviation from center."""
+        return (
+            self.weights * absolute(self.values - center)
+        ).sum() / self.weights.sum()
+
+    def quantile(self, q):
+        """float or numpy array: Approximate quantile(s) for q in [0, 1]."""
+        order = self.values.argsort(kind="stable")
+        values, weights = self.values[order], self.weights[order]
+        if not len(values):
+            return q * float("nan")
+
+        ranks = (cumsum(weights) - weights / 2) / weights.sum()
+        ranks = concatenate([[0], ranks, [1]])
+        values = concatenate([[self.min], values, [self.max]])
+
+        return interp(q, ranks, values)
+
+    def update(self, values):
+        """Sketch: Add an array of values."""
+        values = asarray(values, dtype="float64").ravel()
+        values = values[~isnan(values)]
+        if len(values):
+            self.max = max(self.max, values.max())
+            self.min = min(self.min, values.min())
+
+        self.values = concatenate([self.values, values])
+        self.weights = concatenate([self.weights, ones(len(values))])
+        if len(self.values) > 2 * self.size:
+            self.compress()
+
+        return self